@@ -2,15 +2,32 @@
 
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
+import math
 from typing import Dict, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.services.analysis import llm_scan
+from app.core.budget import TokenBudgetExceeded
+from app.core.cache import cache_get_async, cache_set_async
+from app.core.config import settings
+from app.core.decision import analyze_text_async
+from app.core.metrics import STAGE_SECONDS
+from app.core.openai_client import MODEL, PROMPT_VERSION, llm_scan, llm_scan_incremental, llm_scan_stream
+from app.core.singleflight import group as singleflight_group
+from app.schemas.analysis import AnalyzeResponse
+from app.services.prefilter import prefilter, record_shadow
+from app.services.spans import as_span, locate
 
 router = APIRouter()
 
+# Identical concurrent /api/analyze requests (double clicks, retries, tabs) share one scan
+_analyze_flight = singleflight_group("analyze")
+
 
 class AnalyzeRequest(BaseModel):
     text: str = Field(..., min_length=1)
@@ -65,20 +82,19 @@ def _normalize_findings(findings: list, original_text: str) -> list:
         if (
             isinstance(original, str)
             and original
-            and 0 <= start_i < end_i <= len(original_text)
+            and as_span(original_text, start_i, end_i)
             and original_text[start_i:end_i] != original
         ):
             # If mismatch, try to locate (first occurrence).
-            idx = original_text.find(original)
-            if idx != -1:
-                start_i = idx
-                end_i = idx + len(original)
+            span = locate(original_text, original)
+            if span is not None:
+                start_i, end_i = span
 
         f["start"] = start_i
         f["end"] = end_i
 
         if not isinstance(original, str) or not original:
-            if 0 <= start_i < end_i <= len(original_text):
+            if as_span(original_text, start_i, end_i):
                 f["original"] = original_text[start_i:end_i]
             else:
                 f["original"] = ""
@@ -99,55 +115,234 @@ def _normalize_findings(findings: list, original_text: str) -> list:
     return out
 
 
+def _analyze_cache_key(text: str, lang: str) -> str:
+    """
+    Content-addressed key for /api/analyze results.
+    Text is hashed verbatim: findings carry char offsets into it.
+    Every setting that shapes the output is part of the key: the step-2 mode
+    (concurrent vs batched suggestions), incremental vs whole-text step 1, and
+    the prefilter mode (enforce answers clean texts without the LLM).
+    """
+    raw = json.dumps(
+        [
+            text,
+            lang,
+            MODEL,
+            PROMPT_VERSION,
+            settings.llm_suggest_mode,
+            settings.llm_incremental,
+            settings.prefilter_mode,
+        ],
+        ensure_ascii=False,
+    )
+    return "analyze:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _build_response(findings: list) -> dict:
+    # Decide actions based on finding types:
+    # - avoid => block copy
+    # - replace => block copy (until user changes)
+    # - review only => allow copy
+    has_avoid = any(f.get("type") == "avoid" for f in findings)
+    has_replace = any(f.get("type") == "replace" for f in findings)
+    has_review = any(f.get("type") == "review" for f in findings)
+
+    if has_avoid:
+        primary_action = "avoid"
+        copy_enabled = False
+        overall = "avoid"
+    elif has_replace:
+        primary_action = "replace"
+        copy_enabled = False
+        overall = "replace"
+    else:
+        primary_action = "ok"
+        copy_enabled = True
+        overall = "clean" if not has_review else "review"
+
+    return {
+        "status": "ok",
+        "overall": overall,
+        "primary_action": primary_action,
+        "actions": {
+            "copy_enabled": copy_enabled,
+            "show_suggestion": True,  # frontend tooltip uses findings suggested_rewrite
+            "show_avoid_prompt": True,
+        },
+        "popup_message": None,
+        "error_message": None,
+        "findings": findings,
+    }
+
+
 @router.post("/analyze")
-async def analyze(payload: AnalyzeRequest):
+async def analyze(payload: AnalyzeRequest, response: Response):
     """
     Frontend endpoint: /api/analyze
     Returns a backend-compatible shape the current Page.tsx expects:
       {status, overall, primary_action, actions, popup_message, findings, error_message}
+
+    Results are cached by content (see _analyze_cache_key), except when step 2 fell
+    back to deterministic suggestions for lack of token budget; X-Cache: HIT|MISS.
+    When the prefilter runs, X-Rule-Set names the YAML rule set version it used.
+    Concurrent identical requests are coalesced into one scan.
     """
     try:
-        lang = _locale_to_lang(payload.locale)
+        with STAGE_SECONDS.time(stage="language"):
+            lang = _locale_to_lang(payload.locale)
+
+        use_cache = settings.analyze_cache_ttl > 0
+        key = _analyze_cache_key(payload.text, lang)
+        if use_cache:
+            cached = await cache_get_async(key)
+            if cached is not None:
+                response.headers["X-Cache"] = "HIT"
+                return _build_response(copy.deepcopy(cached))
+
+        # Deterministic gate: "enforce" answers clean without the LLM,
+        # "shadow" only records how often it agrees with the LLM.
+        gate = None
+        if settings.prefilter_mode in ("shadow", "enforce"):
+            gate = prefilter(payload.text)
+            if gate.rule_set:
+                response.headers["X-Rule-Set"] = gate.rule_set
+            if gate.clean and settings.prefilter_mode == "enforce":
+                response.headers["X-Prefilter"] = "clean"
+                return _build_response([])
+
+        async def run() -> list:
+            scan = llm_scan_incremental if settings.llm_incremental else llm_scan
+            out = await scan(text=payload.text, language=lang)
+            findings_raw = out.get("findings", []) or []
+            with STAGE_SECONDS.time(stage="normalize"):
+                findings = _normalize_findings(findings_raw, payload.text)
+            if use_cache and _cacheable(out.get("usage")):
+                await cache_set_async(key, copy.deepcopy(findings), ttl=settings.analyze_cache_ttl)
+            return findings
+
+        # Shared between coalesced requests -> each one gets its own copy
+        findings = copy.deepcopy(await _analyze_flight.do(key, run))
+
+        if gate is not None and settings.prefilter_mode == "shadow":
+            record_shadow(gate, findings)
+
+        response.headers["X-Cache"] = "MISS"
+
+        return _build_response(findings)
+
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers=_retry_after(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _cacheable(usage: Optional[Dict]) -> bool:
+    # Step 2 fell back to deterministic suggestions (token budget spent): serve the
+    # result, but don't keep it for the full TTL after the budget recovers
+    return not (usage or {}).get("budget_fallbacks")
 
-        out = await llm_scan(text=payload.text, language=lang)
-        findings_raw = out.get("findings", []) or []
-        findings = _normalize_findings(findings_raw, payload.text)
-
-        # Decide actions based on finding types:
-        # - avoid => block copy
-        # - replace => block copy (until user changes)
-        # - review only => allow copy
-        has_avoid = any(f.get("type") == "avoid" for f in findings)
-        has_replace = any(f.get("type") == "replace" for f in findings)
-        has_review = any(f.get("type") == "review" for f in findings)
-
-        if has_avoid:
-            primary_action = "avoid"
-            copy_enabled = False
-            overall = "avoid"
-        elif has_replace:
-            primary_action = "replace"
-            copy_enabled = False
-            overall = "replace"
-        else:
-            primary_action = "ok"
-            copy_enabled = True
-            overall = "clean" if not has_review else "review"
-
-        return {
-            "status": "ok",
-            "overall": overall,
-            "primary_action": primary_action,
-            "actions": {
-                "copy_enabled": copy_enabled,
-                "show_suggestion": True,  # frontend tooltip uses findings suggested_rewrite
-                "show_avoid_prompt": True,
-            },
-            "popup_message": None,
-            "error_message": None,
-            "findings": findings,
+
+def _retry_after(e: TokenBudgetExceeded) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _step1_view(findings: list) -> dict:
+    """
+    First stream event: what the editor needs to highlight spans and decide copy
+    before any suggestion exists.
+    """
+    resp = _build_response(findings)
+    resp["findings"] = [
+        {
+            "id": f.get("id"),
+            "type": f.get("type"),
+            "subtype": f.get("subtype"),
+            "start": f.get("start"),
+            "end": f.get("end"),
+            "original": f.get("original"),
+            "message": f.get("message"),
         }
+        for f in findings
+    ]
+    return resp
+
+
+@router.post("/analyze/stream")
+async def analyze_stream(payload: AnalyzeRequest):
+    """
+    Server-Sent Events variant of /api/analyze:
+      event: findings     step-1 findings (type, span, message) + copy decision
+      event: suggestions  {id, suggestions} per finding as step 2 resolves it
+      event: summary      final payload, same shape as /api/analyze
+      event: error        {detail} if the analysis fails mid-stream
+                          (+ status 429, retry_after when the token budget is spent)
+    """
+    with STAGE_SECONDS.time(stage="language"):
+        lang = _locale_to_lang(payload.locale)
+    text = payload.text
 
+    async def events():
+        try:
+            use_cache = settings.analyze_cache_ttl > 0
+            key = _analyze_cache_key(text, lang)
+            cached = await cache_get_async(key) if use_cache else None
+            if cached is not None:
+                findings = copy.deepcopy(cached)
+                yield _sse("findings", _step1_view(findings))
+                yield _sse("summary", _build_response(findings))
+                return
+
+            gate = None
+            if settings.prefilter_mode in ("shadow", "enforce"):
+                gate = prefilter(text)
+                if gate.clean and settings.prefilter_mode == "enforce":
+                    yield _sse("findings", _step1_view([]))
+                    yield _sse("summary", _build_response([]))
+                    return
+
+            async for ev in llm_scan_stream(text=text, language=lang):
+                if ev["event"] == "findings":
+                    with STAGE_SECONDS.time(stage="normalize"):
+                        findings = _normalize_findings(ev["findings"], text)
+                    yield _sse("findings", _step1_view(findings))
+                elif ev["event"] == "suggestions":
+                    yield _sse("suggestions", {"id": ev["id"], "suggestions": ev["suggestions"]})
+                else:
+                    with STAGE_SECONDS.time(stage="normalize"):
+                        findings = _normalize_findings(ev["findings"], text)
+                    if use_cache and _cacheable(ev.get("usage")):
+                        await cache_set_async(key, copy.deepcopy(findings), ttl=settings.analyze_cache_ttl)
+                    if gate is not None and settings.prefilter_mode == "shadow":
+                        record_shadow(gate, findings)
+                    yield _sse("summary", _build_response(findings))
+
+        except TokenBudgetExceeded as e:
+            yield _sse("error", {"detail": str(e), "status": 429, "retry_after": max(1, math.ceil(e.retry_after))})
+        except Exception as e:
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/analyze/items", response_model=AnalyzeResponse)
+async def analyze_items(payload: AnalyzeRequest):
+    """
+    Item-based analysis (core/decision):
+      {is_clean, items, safe_text, copy_allowed, copy_message}
+    The LLM call is awaited on the async client, never blocking the event loop.
+    """
+    try:
+        return await analyze_text_async(payload.text, locale=payload.locale, context=payload.context)
+    except TokenBudgetExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e), headers=_retry_after(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
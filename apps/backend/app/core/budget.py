@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+from .config import settings
+
+# LLM token accounting + budgets.
+#   - RequestUsage: tokens of one analysis (step 1 + step 2), carried in a
+#     contextvar so every call made on behalf of the request adds to it
+#     (tasks spawned for step 2 copy the context and share the same object).
+#   - MinuteBudget: sliding 60 s window per worker process.
+# settings.llm_request_token_budget: step-2 calls reserve their estimated tokens
+#   before they start (reserve/release); once used + reserved tokens would pass
+#   the budget, step 2 stops calling the model and uses deterministic suggestions.
+#   Reserving keeps concurrent calls from overshooting it together.
+# settings.llm_minute_token_budget: when the worker has used this many tokens in
+#   the last minute, new analyses are refused (TokenBudgetExceeded -> 429) and
+#   running ones get deterministic step-2 suggestions.
+# 0 disables either budget.
+
+
+class TokenBudgetExceeded(Exception):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+@dataclass
+class RequestUsage:
+    limit: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    calls: int = 0
+    budget_fallbacks: int = 0
+    reserved: int = 0  # estimates of calls in flight
+    # id() of the findings that got deterministic suggestions instead of the model's:
+    # results holding them must not be cached (they'd outlive the exhausted budget)
+    fallback_findings: Set[int] = field(default_factory=set)
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "total_tokens": self.total_tokens,
+            "calls": self.calls,
+            "budget_fallbacks": self.budget_fallbacks,
+        }
+
+
+class MinuteBudget:
+    def __init__(self, limit: int, window: float = 60.0):
+        self.limit = max(0, int(limit))
+        self.window = window
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        while self._events and self._events[0][0] <= now - self.window:
+            self._used -= self._events.popleft()[1]
+
+    def add(self, tokens: int) -> None:
+        if tokens <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            self._events.append((now, tokens))
+            self._used += tokens
+
+    def used(self) -> int:
+        with self._lock:
+            self._trim(time.monotonic())
+            return self._used
+
+    def exhausted(self) -> bool:
+        return bool(self.limit) and self.used() >= self.limit
+
+    def retry_after(self) -> float:
+        """Seconds until enough of the window expires to get back under the limit."""
+        now = time.monotonic()
+        with self._lock:
+            self._trim(now)
+            over = self._used - self.limit
+            for ts, tokens in self._events:
+                over -= tokens
+                if over < 0:
+                    return max(0.0, ts + self.window - now)
+        return 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"limit": self.limit, "used": self.used(), "window": self.window}
+
+
+_current: ContextVar[Optional[RequestUsage]] = ContextVar("llm_request_usage", default=None)
+
+minute_budget = MinuteBudget(settings.llm_minute_token_budget)
+
+
+def begin_request() -> RequestUsage:
+    """Fresh usage for the analysis running in the current context."""
+    usage = RequestUsage(limit=max(0, int(settings.llm_request_token_budget)))
+    _current.set(usage)
+    return usage
+
+
+def current_usage() -> Optional[RequestUsage]:
+    return _current.get()
+
+
+def record(prompt_tokens: int, completion_tokens: int) -> None:
+    usage = _current.get()
+    if usage is not None:
+        usage.prompt_tokens += prompt_tokens
+        usage.completion_tokens += completion_tokens
+        usage.calls += 1
+    minute_budget.add(prompt_tokens + completion_tokens)
+
+
+def check_minute_budget() -> None:
+    """Before step 1: refuse new analyses while the worker is over its per-minute budget."""
+    if minute_budget.exhausted():
+        retry_after = minute_budget.retry_after()
+        raise TokenBudgetExceeded(
+            f"LLM token budget exhausted ({minute_budget.limit} tokens/minute)", retry_after=retry_after
+        )
+
+
+def reserve(tokens: int) -> bool:
+    """
+    Before a step-2 call: claims its estimated tokens from the request budget.
+    False (nothing reserved) when they don't fit or the worker is over its
+    per-minute budget. Check + claim never await, so concurrent calls can't race.
+    """
+    if minute_budget.exhausted():
+        return False
+    usage = _current.get()
+    if usage is None:
+        return True
+    if usage.limit and usage.total_tokens + usage.reserved + tokens > usage.limit:
+        return False
+    usage.reserved += tokens
+    return True
+
+
+def release(tokens: int) -> None:
+    """After the call (its real usage is recorded by then): drops the reservation."""
+    usage = _current.get()
+    if usage is not None:
+        usage.reserved = max(0, usage.reserved - tokens)
+
+
+def note_fallback(finding: Optional[Dict[str, Any]] = None) -> None:
+    usage = _current.get()
+    if usage is not None:
+        usage.budget_fallbacks += 1
+        if finding is not None:
+            usage.fallback_findings.add(id(finding))
+
+
+def fell_back(finding: Dict[str, Any]) -> bool:
+    """True if step 2 gave this finding (of the current request) budget-fallback suggestions."""
+    usage = _current.get()
+    return usage is not None and id(finding) in usage.fallback_findings
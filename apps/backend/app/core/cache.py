@@ -1,29 +1,325 @@
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
 import time
-from typing import Any, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
-# Basit in-memory TTL cache (Phase-1 için yeterli)
-# Not: Uvicorn reload/çoklu worker olduğunda cache paylaşılmaz, MVP için OK.
+from fastapi.concurrency import run_in_threadpool
 
-_cache: dict[str, tuple[float, Any]] = {}
+from .config import settings
+from .metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# TTL cache, iki katman:
+#   - MemoryCache: process içi LRU (her worker'ın kendi kopyası), item + byte sınırlı
+#   - SQLiteCache: aynı host'taki tüm uvicorn worker'larının paylaştığı dosya (WAL)
+# settings.cache_backend = "memory" -> sadece L1, "sqlite" -> L1 + L2 (read-through).
+# Değerler JSON-serializable olmalı (SQLite katmanı JSON saklar, L1 boyutu JSON ile ölçülür).
+# Async kod cache_get_async / cache_set_async kullanır: SQLite I/O threadpool'da çalışır,
+# event loop'u bloklamaz. SQLite hataları loglanır ve miss sayılır (istek 500 olmaz).
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get_with_ttl(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(value, remaining ttl seconds) or None."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    def get(self, key: str) -> Optional[Any]:
+        hit = self.get_with_ttl(key)
+        return None if hit is None else hit[0]
+
+    # Non-blocking backends answer inline; blocking ones override these
+    async def get_with_ttl_async(self, key: str) -> Optional[Tuple[Any, float]]:
+        return self.get_with_ttl(key)
+
+    async def set_async(self, key: str, value: Any, ttl: float) -> None:
+        self.set(key, value, ttl)
+
+
+def _size_of(value: Any) -> int:
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU bounded by max_items and max_bytes (JSON size of the values).
+    TTL runs on the monotonic clock; expired entries are dropped when read and
+    by a full sweep at most every sweep_interval seconds.
+    """
+
+    def __init__(self, max_items: int, max_bytes: int = 0, sweep_interval: float = 30.0):
+        self.max_items = max(1, int(max_items))
+        self.max_bytes = max(0, int(max_bytes))  # 0 = no byte limit
+        self.sweep_interval = sweep_interval
+        self._data: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expirations": 0}
+
+    def _drop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[1]
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + self.sweep_interval
+        expired = [k for k, (exp, _size, _v) in self._data.items() if exp < now]
+        for k in expired:
+            self._drop(k)
+        self._stats["expirations"] += len(expired)
+
+    def get_with_ttl(self, key: str) -> Optional[Tuple[Any, float]]:
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_sweep(now)
+            item = self._data.get(key)
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            if item[0] < now:
+                # expired
+                self._drop(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return item[2], item[0] - now
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        size = _size_of(value)
+        now = time.monotonic()
+        with self._lock:
+            self._maybe_sweep(now)
+            self._drop(key)
+            if self.max_bytes and size > self.max_bytes:
+                # would evict everything else and still not fit
+                return
+            self._data[key] = (now + ttl, size, value)
+            self._bytes += size
+            self._stats["sets"] += 1
+            while len(self._data) > self.max_items or (self.max_bytes and self._bytes > self.max_bytes):
+                old_key = next(iter(self._data))
+                self._drop(old_key)
+                self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._stats,
+                items=len(self._data),
+                bytes=self._bytes,
+                max_items=self.max_items,
+                max_bytes=self.max_bytes,
+            )
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cross-process tier: one SQLite file in WAL mode, shared by all workers on the host.
+    Expired rows are skipped on read and trimmed every `trim_every` writes, together
+    with the oldest rows beyond max_items.
+    """
+
+    def __init__(self, path: str, max_items: int, trim_every: int = 200):
+        self.path = path
+        self.max_items = max(1, int(max_items))
+        self.trim_every = max(1, int(trim_every))
+        self._writes = 0
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " expires_at REAL NOT NULL,"
+            " value TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+
+    def get_with_ttl(self, key: str) -> Optional[Tuple[Any, float]]:
+        # Wall clock here: expiry must mean the same thing in every process
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT expires_at, value FROM cache WHERE key = ? AND expires_at >= ?",
+                    (key, now),
+                ).fetchone()
+            except sqlite3.Error:
+                # locked past the busy timeout, disk full, corrupt file...: a miss, not a failed request
+                self._stats["errors"] += 1
+                self._stats["misses"] += 1
+                logger.exception("sqlite cache read failed (%s)", self.path)
+                return None
+            self._stats["hits" if row is not None else "misses"] += 1
+        if row is None:
+            return None
+        return json.loads(row[1]), row[0] - now
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, expires_at, value) VALUES (?, ?, ?)",
+                    (key, time.time() + ttl, payload),
+                )
+                self._writes += 1
+                self._stats["sets"] += 1
+                if self._writes % self.trim_every == 0:
+                    self._trim()
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+                logger.exception("sqlite cache write failed (%s)", self.path)
+
+    async def get_with_ttl_async(self, key: str) -> Optional[Tuple[Any, float]]:
+        # busy_timeout can block for seconds: keep it off the event loop
+        return await run_in_threadpool(self.get_with_ttl, key)
+
+    async def set_async(self, key: str, value: Any, ttl: float) -> None:
+        await run_in_threadpool(self.set, key, value, ttl)
+
+    def _trim(self) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+        self._conn.execute(
+            "DELETE FROM cache WHERE key IN ("
+            " SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_items,),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            try:
+                self._conn.execute("DELETE FROM cache")
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+                logger.exception("sqlite cache clear failed (%s)", self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, path=self.path, max_items=self.max_items)
+
+
+class TieredCache(CacheBackend):
+    """Read-through: L1 first, then L2; L2 hits are promoted into L1 with their remaining TTL."""
+
+    def __init__(self, l1: CacheBackend, l2: CacheBackend):
+        self.l1 = l1
+        self.l2 = l2
+
+    def get_with_ttl(self, key: str) -> Optional[Tuple[Any, float]]:
+        hit = self.l1.get_with_ttl(key)
+        if hit is not None:
+            return hit
+
+        hit = self.l2.get_with_ttl(key)
+        if hit is not None and hit[1] > 0:
+            self.l1.set(key, hit[0], hit[1])
+        return hit
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.l1.set(key, value, ttl)
+        self.l2.set(key, value, ttl)
+
+    async def get_with_ttl_async(self, key: str) -> Optional[Tuple[Any, float]]:
+        hit = await self.l1.get_with_ttl_async(key)
+        if hit is not None:
+            return hit
+
+        hit = await self.l2.get_with_ttl_async(key)
+        if hit is not None and hit[1] > 0:
+            await self.l1.set_async(key, hit[0], hit[1])
+        return hit
+
+    async def set_async(self, key: str, value: Any, ttl: float) -> None:
+        await self.l1.set_async(key, value, ttl)
+        await self.l2.set_async(key, value, ttl)
+
+    def clear(self) -> None:
+        self.l1.clear()
+        self.l2.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"l1": self.l1.stats(), "l2": self.l2.stats()}
+
+
+def _make_backend() -> CacheBackend:
+    memory = MemoryCache(
+        settings.cache_max_items,
+        max_bytes=settings.cache_max_bytes,
+        sweep_interval=settings.cache_sweep_interval,
+    )
+    if settings.cache_backend != "sqlite":
+        return memory
+
+    path = settings.cache_sqlite_path or os.path.join(tempfile.gettempdir(), "equaltype_cache.sqlite3")
+    return TieredCache(memory, SQLiteCache(path, settings.cache_sqlite_max_items))
+
+
+_backend: CacheBackend = _make_backend()
+
+
+def _count(key: str, value: Optional[Any]) -> None:
+    # keys are "<namespace>:<hash>" (analyze:, sentence:, ...)
+    CACHE_REQUESTS.inc(cache=key.split(":", 1)[0], result="miss" if value is None else "hit")
 
 
 def cache_get(key: str) -> Optional[Any]:
-    item = _cache.get(key)
-    if not item:
-        return None
-
-    expires_at, value = item
-    if expires_at < time.time():
-        # expired
-        _cache.pop(key, None)
-        return None
+    value = _backend.get(key)
+    _count(key, value)
     return value
 
 
 def cache_set(key: str, value: Any, ttl: int = 60) -> None:
-    expires_at = time.time() + ttl
-    _cache[key] = (expires_at, value)
+    _backend.set(key, value, ttl)
+
+
+async def cache_get_async(key: str) -> Optional[Any]:
+    hit = await _backend.get_with_ttl_async(key)
+    value = None if hit is None else hit[0]
+    _count(key, value)
+    return value
+
+
+async def cache_set_async(key: str, value: Any, ttl: int = 60) -> None:
+    await _backend.set_async(key, value, ttl)
 
 
 def cache_clear() -> None:
-    _cache.clear()
+    _backend.clear()
+
+
+def cache_stats() -> Dict[str, Any]:
+    return _backend.stats()
@@ -0,0 +1,225 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+from .config import settings
+
+# Record/replay for OpenAI calls, at the httpx transport level (both SDK clients:
+# core/openai_client.py and services/llm.py).
+#   settings.cassette_mode:
+#     "off"    -> normal network calls (default)
+#     "record" -> call the API, store every 2xx response
+#     "replay" -> answer from the cassette only; a miss is a 404 (SDK raises NotFoundError)
+#     "auto"   -> replay hits, record misses
+# Calls are keyed on (endpoint, model, sha256 of messages/input, temperature).
+# Store: one JSON object per line (settings.cassette_path), later lines win.
+#
+#   CASSETTE_MODE=record CASSETTE_PATH=tests/cassettes/openai.jsonl uvicorn main:app
+#   python tests/run_cases.py ...            # once against the live API
+#   CASSETTE_MODE=replay ...                 # then offline, deterministic
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+
+
+def request_key(request: httpx.Request) -> str:
+    try:
+        body = json.loads(request.content or b"{}")
+    except ValueError:
+        body = {}
+    if not isinstance(body, dict):
+        body = {}
+
+    # "chat/completions" | "responses", whatever the base URL prefix is
+    endpoint = request.url.path.split("/v1/", 1)[-1]
+    messages = body.get("messages", body.get("input"))
+    messages_hash = hashlib.sha256(_canonical(messages).encode("utf-8")).hexdigest()
+    raw = _canonical([endpoint, body.get("model"), messages_hash, body.get("temperature")])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class CassetteStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._stats = {"hits": 0, "misses": 0, "recorded": 0}
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            self._stats["hits" if entry is not None else "misses"] += 1
+        return entry
+
+    def put(self, key: str, request: httpx.Request, response: httpx.Response, latency: float) -> None:
+        try:
+            body = response.json()
+        except ValueError:
+            return
+        try:
+            model = json.loads(request.content or b"{}").get("model")
+        except (ValueError, AttributeError):
+            model = None
+
+        entry = {
+            "key": key,
+            "endpoint": request.url.path,
+            "model": model,
+            "status": response.status_code,
+            "latency_ms": round(latency * 1000, 1),
+            "recorded_at": int(time.time()),
+            "body": body,
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._entries[key] = entry
+            self._stats["recorded"] += 1
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), path=self.path)
+
+
+def _replayed(request: httpx.Request, entry: Dict[str, Any]) -> httpx.Response:
+    return httpx.Response(
+        entry.get("status", 200),
+        headers={"content-type": "application/json", "x-cassette": "hit"},
+        content=json.dumps(entry["body"], ensure_ascii=False).encode("utf-8"),
+        request=request,
+    )
+
+
+def _miss(request: httpx.Request) -> httpx.Response:
+    error = {
+        "error": {
+            "message": f"No cassette entry for {request.method} {request.url.path}",
+            "type": "cassette_miss",
+            "param": None,
+            "code": "cassette_miss",
+        }
+    }
+    return httpx.Response(404, json=error, headers={"x-cassette": "miss"}, request=request)
+
+
+def _replay_delay(entry: Dict[str, Any], scale: float) -> float:
+    return max(0.0, float(entry.get("latency_ms") or 0.0) / 1000 * scale)
+
+
+class CassetteTransport(httpx.BaseTransport):
+    def __init__(self, store: CassetteStore, mode: str, latency_scale: float = 0.0):
+        self.store = store
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._inner = httpx.HTTPTransport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        if self.mode in ("replay", "auto"):
+            entry = self.store.get(key)
+            if entry is not None:
+                delay = _replay_delay(entry, self.latency_scale)
+                if delay:
+                    time.sleep(delay)
+                return _replayed(request, entry)
+            if self.mode == "replay":
+                return _miss(request)
+
+        t0 = time.perf_counter()
+        response = self._inner.handle_request(request)
+        response.read()
+        if response.is_success:
+            self.store.put(key, request, response, time.perf_counter() - t0)
+        return response
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    def __init__(self, store: CassetteStore, mode: str, latency_scale: float = 0.0):
+        self.store = store
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request)
+        if self.mode in ("replay", "auto"):
+            entry = self.store.get(key)
+            if entry is not None:
+                delay = _replay_delay(entry, self.latency_scale)
+                if delay:
+                    await asyncio.sleep(delay)
+                return _replayed(request, entry)
+            if self.mode == "replay":
+                return _miss(request)
+
+        t0 = time.perf_counter()
+        response = await self._inner.handle_async_request(request)
+        await response.aread()
+        if response.is_success:
+            # file append (+ makedirs) is blocking I/O: not on the event loop
+            await run_in_threadpool(self.store.put, key, request, response, time.perf_counter() - t0)
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+MODES = ("off", "record", "replay", "auto")
+
+_store: Optional[CassetteStore] = None
+
+
+def _active_store() -> Optional[CassetteStore]:
+    global _store
+    if settings.cassette_mode not in MODES:
+        raise ValueError(f"cassette_mode must be one of {MODES}, got {settings.cassette_mode!r}")
+    if settings.cassette_mode == "off":
+        return None
+    if _store is None:
+        _store = CassetteStore(settings.cassette_path or os.path.join("tests", "cassettes", "openai.jsonl"))
+    return _store
+
+
+def http_client() -> Optional[httpx.Client]:
+    """httpx client for OpenAI(http_client=...); None (SDK default) when cassettes are off."""
+    store = _active_store()
+    if store is None:
+        return None
+    return DefaultHttpxClient(
+        transport=CassetteTransport(store, settings.cassette_mode, settings.cassette_latency_scale)
+    )
+
+
+def async_http_client() -> Optional[httpx.AsyncClient]:
+    store = _active_store()
+    if store is None:
+        return None
+    return DefaultAsyncHttpxClient(
+        transport=AsyncCassetteTransport(store, settings.cassette_mode, settings.cassette_latency_scale)
+    )
+
+
+def stats() -> Optional[Dict[str, Any]]:
+    return None if _store is None else _store.stats()
@@ -5,6 +5,64 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     openai_model: str = "gpt-4.1-mini"
     cache_max_items: int = 2000
+    cache_max_bytes: int = 64 * 1024 * 1024  # in-process tier, JSON size of values; 0 = unbounded
+    cache_sweep_interval: float = 30.0  # seconds between full expired-entry sweeps
+
+    # core/cache backend: "memory" (per worker) | "sqlite" (memory L1 + host-wide SQLite L2)
+    cache_backend: str = "memory"
+    cache_sqlite_path: str = ""  # empty -> <tmpdir>/equaltype_cache.sqlite3
+    cache_sqlite_max_items: int = 50000
+
+    # /api/analyze result cache (seconds, 0 disables)
+    analyze_cache_ttl: int = 600
+
+    # Incremental mode: memoize findings per sentence, send only changed sentences
+    llm_incremental: bool = False
+    sentence_cache_ttl: int = 3600
+
+    # Deterministic pre-filter in front of the LLM: "off" | "shadow" | "enforce"
+    prefilter_mode: str = "off"
+
+    # Step-2 suggestion calls:
+    #   "concurrent" -> one call per finding, max llm_suggest_concurrency in flight
+    #   "batched"    -> one call for all findings of a request
+    llm_suggest_mode: str = "concurrent"
+    llm_suggest_concurrency: int = 4
+
+    # LLM token budgets (core/budget.py), 0 = unlimited:
+    #   per request -> step 2 switches to deterministic suggestions once used +
+    #   in-flight (reserved) tokens would pass it
+    #   per minute (per worker) -> new analyses get 429, running ones fall back
+    llm_request_token_budget: int = 0
+    llm_minute_token_budget: int = 0
+
+    # /api/events write-behind buffer: 202 immediately, bulk INSERT every
+    # event_buffer_max_batch events or event_buffer_flush_ms, whichever first
+    event_buffer_enabled: bool = False
+    event_buffer_max_batch: int = 200
+    event_buffer_flush_ms: int = 2000
+    event_buffer_max_size: int = 10000  # queued events; beyond this -> 503
+    event_buffer_put_timeout_ms: int = 100  # how long a full queue may block a request
+
+    # Database (app/db.py). db_async -> events/powermove handlers use an AsyncSession
+    # (asyncpg; aiosqlite for sqlite URLs) instead of a sync Session in the threadpool.
+    # Pool sizing applies to each engine (sync and async) separately.
+    db_async: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # seconds; -1 disables
+
+    # Hourly event rollups (services/rollups.py): background refresher + summary reads
+    rollup_enabled: bool = False
+    rollup_grace_seconds: int = 300  # an hour is closed this long after it ends
+    rollup_refresh_interval: float = 60.0
+    rollup_max_hours_per_run: int = 24
+
+    # OpenAI record/replay (core/cassette.py): "off" | "record" | "replay" | "auto"
+    cassette_mode: str = "off"
+    cassette_path: str = ""  # empty -> tests/cassettes/openai.jsonl (relative to cwd)
+    cassette_latency_scale: float = 0.0  # replay delay = recorded latency x scale (0 = instant)
 
     class Config:
         env_file = ".env"
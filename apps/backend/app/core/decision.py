@@ -1,16 +1,27 @@
 from typing import Any, Dict, Optional
 
 from app.schemas.analysis import AnalyzeResponse
-from app.services.llm import analyze_with_llm
+from app.services.llm import analyze_text_with_llm, analyze_text_with_llm_async
+from app.services.postprocess import postprocess_llm_result
 
 def analyze_text(text: str, locale: str = "en-US", context: Optional[Dict[str, Any]] = None) -> AnalyzeResponse:
     """
     LLM-only brain.
     If LLM not configured, returns clean + popup message.
     """
-    data = analyze_with_llm(text, locale=locale, context=context)
+    data = analyze_text_with_llm(text)
 
-    # Pydantic response_model is AnalyzeResponse, ama sen şemanı genişlettin (status/actions vs).
-    # AnalyzeResponse bunu kapsıyorsa direkt dönebilir.
-    # Eğer şeman dar ise, aşağıdaki gibi sadece temel alanları döndürmen gerekir.
-    return AnalyzeResponse(**data)
+    # Pydantic response_model is AnalyzeResponse: postprocess_llm_result normalizes the
+    # LLM items into that schema (severity/actions/copy policy/safe_text).
+    return AnalyzeResponse(**postprocess_llm_result(text, data))
+
+
+async def analyze_text_async(
+    text: str, locale: str = "en-US", context: Optional[Dict[str, Any]] = None
+) -> AnalyzeResponse:
+    """
+    analyze_text for async handlers: awaits the shared AsyncOpenAI client
+    (services/llm), so the event loop keeps serving other requests meanwhile.
+    """
+    data = await analyze_text_with_llm_async(text)
+    return AnalyzeResponse(**postprocess_llm_result(text, data))
@@ -0,0 +1,168 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Minimal Prometheus text-format metrics (counters + histograms), served by main.py /metrics.
+# Per worker process, like core/cache and core/singleflight: scrape every worker
+# (or sum in PromQL) when running with several uvicorn workers.
+
+LabelValues = Tuple[str, ...]
+
+# seconds; covers sub-ms local stages up to slow model calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_fmt(v)}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[LabelValues, List[float]] = {}  # key -> bucket counts + [sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, le in enumerate(self.buckets):
+                if value <= le:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observes the block's wall time, also when it raises."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            row = self._values.get(self._key(labels))
+            return 0 if row is None else int(row[-1])
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            for key, row in sorted(self._values.items()):
+                cumulative = 0.0
+                for le, n in zip(self.buckets, row):
+                    cumulative += n
+                    le_label = 'le="%s"' % _fmt(le)
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le_label)} {_fmt(cumulative)}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(row[-2])}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_fmt(row[-1])}")
+        return lines
+
+
+_registry: List[_Metric] = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# -----------------------------------------------------------------------------
+# Metrics
+# -----------------------------------------------------------------------------
+# stage: language | step1 | step2 | clamp | normalize
+STAGE_SECONDS = _register(
+    Histogram("equaltype_stage_seconds", "Time spent per analysis pipeline stage.", ["stage"])
+)
+
+# call: detect | suggest | suggest_batch | responses; kind: prompt | completion
+LLM_TOKENS = _register(
+    Counter("equaltype_llm_tokens_total", "LLM tokens reported in response usage.", ["call", "kind"])
+)
+
+# status: HTTP status, or "connection" / "timeout" when no response came back
+LLM_ERRORS = _register(Counter("equaltype_llm_errors_total", "Failed LLM calls.", ["call", "status"]))
+
+# kind: step2_fallback (suggestions served without the model) | rejected (429 before step 1)
+LLM_BUDGET = _register(Counter("equaltype_llm_budget_total", "Token budget interventions.", ["kind"]))
+
+# cache: key prefix (analyze | sentence | ...); result: hit | miss
+CACHE_REQUESTS = _register(
+    Counter("equaltype_cache_requests_total", "core/cache lookups by result.", ["cache", "result"])
+)
+
+# path: direct | batch | buffered (rows written by the event buffer)
+EVENTS_INGESTED = _register(Counter("equaltype_events_ingested_total", "Analytics events written.", ["path"]))
@@ -1,13 +1,26 @@
+import asyncio
+import bisect
+import copy
+import hashlib
 import json
 import re
-from typing import Any, Dict, Optional, List, Tuple
-
-from openai import AsyncOpenAI
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple
+
+from openai import APIConnectionError, APIStatusError, APITimeoutError, AsyncOpenAI
+from app.services.rules import scan_text
+from . import budget
+from .cache import cache_get_async, cache_set_async
+from .cassette import async_http_client
+from .metrics import LLM_BUDGET, LLM_ERRORS, LLM_TOKENS, STAGE_SECONDS
 from .config import settings
 
-_client = AsyncOpenAI(api_key=settings.openai_api_key)
+_client = AsyncOpenAI(api_key=settings.openai_api_key, http_client=async_http_client())
 MODEL = getattr(settings, "openai_model", None) or "gpt-4o-mini"
 
+# Bump whenever a prompt or the post-processing below changes output shape/content.
+# Part of every result cache key, so stale cached findings are never served.
+PROMPT_VERSION = "2"
+
 
 # -----------------------------------------------------------------------------
 # Helpers
@@ -127,6 +140,79 @@ def _is_placeholder_replacement(rep: str) -> bool:
     return r in bad
 
 
+def _fallback_suggestions(ftype: str) -> List[Dict[str, Any]]:
+    """
+    Deterministic step-2 result when the model gives nothing usable (or the call fails).
+    replace -> safe generic reference; review -> no rewrite (suggestions are optional).
+    """
+    if ftype != "replace":
+        return []
+    return [
+        {
+            "text": "people",
+            "replacement": "people",
+            "message": "Use respectful, neutral language when referring to groups of people.",
+        }
+    ]
+
+
+def _clean_suggestions(ftype: str, raw_suggestions: Any) -> List[Dict[str, Any]]:
+    """
+    Step-2 output cleanup (shared by single and batched calls):
+    - drop empty/placeholder replacements
+    - replace: max 3, never empty (hard fallback)
+    - review: max 2, may be empty
+    """
+    sug = _normalize_suggestions(ftype, raw_suggestions)
+
+    cleaned: List[Dict[str, Any]] = []
+    for s in sug:
+        rep = _to_clean_str(s.get("replacement"))
+        if not rep:
+            continue
+        if _is_placeholder_replacement(rep):
+            continue
+        cleaned.append(s)
+
+    if ftype == "review":
+        return cleaned[:2]
+
+    if cleaned:
+        return cleaned[:3]
+
+    # Final hard fallback (never placeholder)
+    return _fallback_suggestions("replace")
+
+
+async def _chat(call: str, messages: List[Dict[str, str]]) -> str:
+    """
+    One chat completion, returns the message content.
+    call: detect | suggest | suggest_batch -> stage time, token usage and errors in core/metrics.
+    """
+    stage = "step1" if call == "detect" else "step2"
+    with STAGE_SECONDS.time(stage=stage):
+        try:
+            res = await _client.chat.completions.create(model=MODEL, messages=messages, temperature=0.2)
+        except APIStatusError as e:
+            LLM_ERRORS.inc(call=call, status=str(e.status_code))
+            raise
+        except APITimeoutError:
+            LLM_ERRORS.inc(call=call, status="timeout")
+            raise
+        except APIConnectionError:
+            LLM_ERRORS.inc(call=call, status="connection")
+            raise
+
+    usage = getattr(res, "usage", None)
+    if usage is not None:
+        prompt_tokens, completion_tokens = usage.prompt_tokens or 0, usage.completion_tokens or 0
+        LLM_TOKENS.inc(prompt_tokens, call=call, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, call=call, kind="completion")
+        budget.record(prompt_tokens, completion_tokens)
+
+    return res.choices[0].message.content or "{}"
+
+
 async def _llm_suggest_replacements(
     *,
     sentence: str,
@@ -174,36 +260,9 @@ async def _llm_suggest_replacements(
         "Return JSON now."
     )
 
-    res = await _client.chat.completions.create(
-        model=MODEL,
-        messages=[{"role": "system", "content": sys}, {"role": "user", "content": user}],
-        temperature=0.2,
-    )
-
-    content = res.choices[0].message.content or "{}"
+    content = await _chat("suggest", [{"role": "system", "content": sys}, {"role": "user", "content": user}])
     data = _extract_json(content)
-    sug = _normalize_suggestions("replace", data.get("suggestions", []))
-
-    cleaned: List[Dict[str, Any]] = []
-    for s in sug:
-        rep = _to_clean_str(s.get("replacement"))
-        if not rep:
-            continue
-        if _is_placeholder_replacement(rep):
-            continue
-        cleaned.append(s)
-
-    if cleaned:
-        return cleaned[:3]
-
-    # Final hard fallback (never placeholder)
-    return [
-        {
-            "text": "people",
-            "replacement": "people",
-            "message": "Use respectful, neutral language when referring to groups of people.",
-        }
-    ]
+    return _clean_suggestions("replace", data.get("suggestions", []))
 
 
 async def _llm_suggest_review_rewrites(
@@ -234,26 +293,67 @@ async def _llm_suggest_review_rewrites(
         "Return JSON now."
     )
 
-    res = await _client.chat.completions.create(
-        model=MODEL,
-        messages=[{"role": "system", "content": sys}, {"role": "user", "content": user}],
-        temperature=0.2,
+    content = await _chat("suggest", [{"role": "system", "content": sys}, {"role": "user", "content": user}])
+    data = _extract_json(content)
+    return _clean_suggestions("review", data.get("suggestions", []))
+
+
+async def _llm_suggest_batch(
+    *,
+    items: List[Dict[str, Any]],
+    language: str,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Batched second-step call: one prompt for every sentence that needs suggestions.
+    items: [{ "id", "kind": "replace"|"review", "subtype", "sentence" }, ...]
+    Returns { id: cleaned suggestions }. Ids the model skipped get the fallback.
+
+    Same rules as the single-item prompts; we still never send the slur term itself.
+    """
+    sys = (
+        "You are EqualType, an inclusive language assistant.\n"
+        "You receive several items. Each item has an id, a kind, a subtype and a sentence.\n"
+        "Return ONLY JSON: {\"results\": [{\"id\": \"string\", \"suggestions\": [...]}]}\n\n"
+        "Each suggestion must be an object:\n"
+        "{ \"replacement\": \"string\", \"message\": \"string\" }\n\n"
+        "Per kind:\n"
+        '- kind="replace", subtype="identity_slur": respectful reference phrases to replace an identity-based slur/insult in the sentence. '
+        "If context is unclear, use a safe generic like 'people' or 'a group of people'.\n"
+        '- kind="replace" (other subtypes): neutral replacements for the problematic term/phrase in the sentence.\n'
+        '- kind="review": the user may be reporting violence or sensitive content. Provide 1–2 rewrites that are '
+        "clearer/less graphic and avoid unnecessary escalation. Do NOT censor facts; do not refuse. Keep meaning as close as possible.\n\n"
+        "Rules:\n"
+        "- Return exactly one result per item id.\n"
+        "- NEVER repeat any slur/insult, offensive wording or masked form.\n"
+        "- NEVER output placeholders like 'neutral alternative' or 'a neutral term'.\n"
+        "- Replacement must be non-empty and fit the sentence.\n"
+    )
+
+    payload = {
+        "items": [
+            {"id": it["id"], "kind": it["kind"], "subtype": it["subtype"], "sentence": it["sentence"]}
+            for it in items
+        ]
+    }
+    user = (
+        f"Language: {language}\n\n"
+        f"Items:\n{json.dumps(payload, ensure_ascii=False)}\n\n"
+        "Return JSON now."
     )
 
-    content = res.choices[0].message.content or "{}"
+    content = await _chat("suggest_batch", [{"role": "system", "content": sys}, {"role": "user", "content": user}])
     data = _extract_json(content)
-    sug = _normalize_suggestions("review", data.get("suggestions", []))
 
-    cleaned: List[Dict[str, Any]] = []
-    for s in sug:
-        rep = _to_clean_str(s.get("replacement"))
-        if not rep:
-            continue
-        if _is_placeholder_replacement(rep):
-            continue
-        cleaned.append(s)
+    raw_by_id: Dict[str, Any] = {}
+    results = data.get("results", [])
+    if isinstance(results, list):
+        for r in results:
+            if isinstance(r, dict):
+                rid = _to_clean_str(r.get("id"))
+                if rid and rid not in raw_by_id:
+                    raw_by_id[rid] = r.get("suggestions", [])
 
-    return cleaned[:2]
+    return {it["id"]: _clean_suggestions(it["kind"], raw_by_id.get(it["id"])) for it in items}
 
 
 def _clamp_findings(text: str, findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -319,19 +419,213 @@ def _clamp_findings(text: str, findings: List[Dict[str, Any]]) -> List[Dict[str,
 
 
 # -----------------------------------------------------------------------------
-# Main
+# Step 2: suggestions
 # -----------------------------------------------------------------------------
-async def llm_scan(text: str, language: Optional[str] = None) -> Dict[str, Any]:
+def _needs_suggestions(f: Dict[str, Any]) -> bool:
+    ftype = f.get("type")
+    sugs = f.get("suggestions") or []
+
+    if ftype == "replace":
+        first_rep = ""
+        if sugs and isinstance(sugs[0], dict):
+            first_rep = _to_clean_str(sugs[0].get("replacement"))
+        return (not sugs) or _is_placeholder_replacement(first_rep)
+
+    if ftype == "review":
+        # Review-only: do NOT block copy; suggestions optional (calmer rewrite)
+        return not sugs
+
+    # avoid: do nothing
+    return False
+
+
+def _budget_fallback(text: str, f: Dict[str, Any], target_lang: str) -> List[Dict[str, Any]]:
     """
-    Step 1: detect findings: replace / avoid / review (+ subtype)
-    Step 2:
-      - for replace: guarantee real replacements (no placeholder)
-      - for review: optionally provide 1–2 calmer rewrites
+    Step-2 result without the model (token budget spent): suggestions of the YAML
+    rule matching the finding's span, else the generic fallback.
+    """
+    budget.note_fallback(f)
+    LLM_BUDGET.inc(kind="step2_fallback")
+
+    ftype = _to_clean_str(f.get("type"))
+    if ftype == "replace":
+        for r in scan_text(target_lang, text[int(f["start"]) : int(f["end"])]):
+            if r.get("rule_suggestions"):
+                return _clean_suggestions(
+                    "replace",
+                    [{"replacement": x, "message": r.get("description") or ""} for x in r["rule_suggestions"]],
+                )
+    return _fallback_suggestions(ftype)
+
+
+def _check_minute_budget() -> None:
+    try:
+        budget.check_minute_budget()
+    except budget.TokenBudgetExceeded:
+        LLM_BUDGET.inc(kind="rejected")
+        raise
+
+
+# Step-2 token estimates for budget.reserve: ~4 chars per token, prompt overhead
+# measured on the prompts above, completion = a few short suggestions
+_SUGGEST_PROMPT_TOKENS = 250
+_SUGGEST_COMPLETION_TOKENS = 150
+_BATCH_ITEM_TOKENS = 60
+
+
+def _suggest_estimate(sentence: str) -> int:
+    return _SUGGEST_PROMPT_TOKENS + len(sentence) // 4 + _SUGGEST_COMPLETION_TOKENS
+
+
+def _batch_estimate(jobs: List[Dict[str, Any]]) -> int:
+    return _SUGGEST_PROMPT_TOKENS + sum(
+        len(job["sentence"]) // 4 + _BATCH_ITEM_TOKENS + _SUGGEST_COMPLETION_TOKENS for job in jobs
+    )
+
+
+async def _suggest_for_finding(
+    text: str,
+    f: Dict[str, Any],
+    target_lang: str,
+    sem: asyncio.Semaphore,
+) -> List[Dict[str, Any]]:
     """
+    One step-2 call for one finding. A failed call degrades to the deterministic
+    fallback for that finding only; it never fails the whole request.
+    """
+    ftype = f.get("type")
+    s, e = _expand_to_sentence(text, int(f["start"]), int(f["end"]))
+    sent = text[s:e]
+
+    estimate = _suggest_estimate(sent)
+    async with sem:
+        # Reserved right before the call and released once its real usage is recorded:
+        # calls in flight count against the budget, so concurrency can't overshoot it
+        if not budget.reserve(estimate):
+            return _budget_fallback(text, f, target_lang)
+        try:
+            if ftype == "replace":
+                return await _llm_suggest_replacements(
+                    sentence=sent,
+                    language=target_lang,
+                    subtype=_to_clean_str(f.get("subtype")) or "simple",
+                )
+            return await _llm_suggest_review_rewrites(
+                sentence=sent,
+                language=target_lang,
+            )
+        except Exception:
+            return _fallback_suggestions(ftype)
+        finally:
+            budget.release(estimate)
+
+
+async def _fill_suggestions_batched(
+    text: str,
+    pending: List[Dict[str, Any]],
+    target_lang: str,
+) -> None:
+    """
+    One LLM call for all pending findings. Identical (kind, subtype, sentence)
+    jobs are sent once and fanned back out to every finding that needs them.
+    """
+    jobs: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+    job_of: List[Dict[str, Any]] = []
+
+    for f in pending:
+        ftype = _to_clean_str(f.get("type"))
+        subtype = (_to_clean_str(f.get("subtype")) or "simple") if ftype == "replace" else ""
+        s, e = _expand_to_sentence(text, int(f["start"]), int(f["end"]))
+        key = (ftype, subtype, text[s:e])
+
+        job = jobs.get(key)
+        if job is None:
+            job = {"id": f"s{len(jobs) + 1}", "kind": ftype, "subtype": subtype or "simple", "sentence": key[2]}
+            jobs[key] = job
+        job_of.append(job)
+
+    estimate = _batch_estimate(list(jobs.values()))
+    if not budget.reserve(estimate):
+        for f in pending:
+            f["suggestions"] = _budget_fallback(text, f, target_lang)
+        return
+
+    try:
+        by_id = await _llm_suggest_batch(items=list(jobs.values()), language=target_lang)
+    except Exception:
+        by_id = {}
+    finally:
+        budget.release(estimate)
+
+    for f, job in zip(pending, job_of):
+        sugs = by_id.get(job["id"])
+        if sugs is None:
+            sugs = _fallback_suggestions(job["kind"])
+        # Each finding gets its own list (dedup shares the job, not the objects)
+        f["suggestions"] = [dict(x) for x in sugs]
+
+
+async def _iter_suggestions(
+    text: str,
+    findings: List[Dict[str, Any]],
+    target_lang: str,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Step 2. Fills suggestions in-place and yields each finding as soon as its
+    suggestions are resolved.
+
+    settings.llm_suggest_mode:
+      - "concurrent": one call per finding, at most settings.llm_suggest_concurrency in flight
+      - "batched": one call for all findings of the request
+    """
+    pending = [f for f in findings if _needs_suggestions(f)]
+    if not pending:
+        return
+
+    if settings.llm_suggest_mode == "batched":
+        await _fill_suggestions_batched(text, pending, target_lang)
+        for f in pending:
+            yield f
+        return
+
+    sem = asyncio.Semaphore(max(1, int(settings.llm_suggest_concurrency)))
+
+    async def run(f: Dict[str, Any]) -> Dict[str, Any]:
+        f["suggestions"] = await _suggest_for_finding(text, f, target_lang, sem)
+        return f
+
+    tasks = [asyncio.ensure_future(run(f)) for f in pending]
+    try:
+        for fut in asyncio.as_completed(tasks):
+            yield await fut
+    finally:
+        # Consumer went away (e.g. client closed the stream): stop paying for calls
+        for t in tasks:
+            t.cancel()
+
+
+async def _fill_suggestions(text: str, findings: List[Dict[str, Any]], target_lang: str) -> None:
+    """
+    Runs step 2 to completion. Mutates findings in-place.
+    """
+    async for _ in _iter_suggestions(text, findings, target_lang):
+        pass
+
+
+# -----------------------------------------------------------------------------
+# Main
+# -----------------------------------------------------------------------------
+def _target_lang(language: Optional[str]) -> str:
     target_lang = (language or "en").lower()
     if target_lang == "auto":
         target_lang = "en"
+    return target_lang
+
 
+async def _llm_detect(text: str, target_lang: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Step 1 call. Returns (raw model JSON, clamped findings).
+    """
     sys = (
         "You are EqualType, an inclusive language assistant.\n"
         "Detect discriminatory, exclusionary, or harmful language.\n"
@@ -360,53 +654,177 @@ async def llm_scan(text: str, language: Optional[str] = None) -> Dict[str, Any]:
         "Return JSON now."
     )
 
-    res = await _client.chat.completions.create(
-        model=MODEL,
-        messages=[{"role": "system", "content": sys}, {"role": "user", "content": user}],
-        temperature=0.2,
-    )
-
-    content = res.choices[0].message.content or "{}"
+    content = await _chat("detect", [{"role": "system", "content": sys}, {"role": "user", "content": user}])
     data = _extract_json(content)
 
     findings = data.get("findings", [])
     if not isinstance(findings, list):
         findings = []
 
-    normalized = _clamp_findings(text, findings)
+    with STAGE_SECONDS.time(stage="clamp"):
+        clamped = _clamp_findings(text, findings)
+    return data, clamped
+
+
+async def llm_scan(text: str, language: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Step 1: detect findings: replace / avoid / review (+ subtype)
+    Step 2:
+      - for replace: guarantee real replacements (no placeholder)
+      - for review: optionally provide 1–2 calmer rewrites
+    """
+    target_lang = _target_lang(language)
+    usage = budget.begin_request()
+    _check_minute_budget()
+
+    data, normalized = await _llm_detect(text, target_lang)
 
     # Step 2: Guarantee suggestions where needed
-    for f in normalized:
-        ftype = f.get("type")
-
-        if ftype == "replace":
-            subtype = _to_clean_str(f.get("subtype")) or "simple"
-            sugs = f.get("suggestions") or []
-            first_rep = ""
-            if sugs and isinstance(sugs[0], dict):
-                first_rep = _to_clean_str(sugs[0].get("replacement"))
-
-            if (not sugs) or _is_placeholder_replacement(first_rep):
-                s, e = _expand_to_sentence(text, int(f["start"]), int(f["end"]))
-                sent = text[s:e]
-                f["suggestions"] = await _llm_suggest_replacements(
-                    sentence=sent,
-                    language=target_lang,
-                    subtype=subtype,
-                )
+    await _fill_suggestions(text, normalized, target_lang)
 
-        elif ftype == "review":
-            # Review-only: do NOT block copy; suggestions optional (calmer rewrite)
-            sugs = f.get("suggestions") or []
-            if not sugs:
-                s, e = _expand_to_sentence(text, int(f["start"]), int(f["end"]))
-                sent = text[s:e]
-                f["suggestions"] = await _llm_suggest_review_rewrites(
-                    sentence=sent,
-                    language=target_lang,
-                )
+    lang_out = data.get("language") or (language or "auto")
+    return {"language": lang_out, "findings": normalized, "usage": usage.as_dict()}
 
-        # avoid: do nothing
 
+async def llm_scan_stream(text: str, language: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    llm_scan, step by step:
+      {"event": "findings", "language", "findings"}     right after step 1 (suggestions may be empty)
+      {"event": "suggestions", "id", "suggestions"}      once per finding, as step 2 resolves it
+      {"event": "done", "language", "findings"}          same payload llm_scan returns
+    """
+    target_lang = _target_lang(language)
+    usage = budget.begin_request()
+    _check_minute_budget()
+
+    data, normalized = await _llm_detect(text, target_lang)
     lang_out = data.get("language") or (language or "auto")
-    return {"language": lang_out, "findings": normalized}
+    yield {"event": "findings", "language": lang_out, "findings": normalized}
+
+    async for f in _iter_suggestions(text, normalized, target_lang):
+        yield {"event": "suggestions", "id": f["id"], "suggestions": f["suggestions"]}
+
+    yield {"event": "done", "language": lang_out, "findings": normalized, "usage": usage.as_dict()}
+
+
+# -----------------------------------------------------------------------------
+# Incremental (sentence-level memoized) scan
+# -----------------------------------------------------------------------------
+def _split_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Sentence spans with the same boundaries as _expand_to_sentence:
+    leading whitespace skipped, terminator included, trailing whitespace trimmed.
+    """
+    out: List[Tuple[int, int]] = []
+    n = len(text)
+    i = 0
+    while i < n:
+        s = i
+        while s < n and text[s].isspace():
+            s += 1
+        if s >= n:
+            break
+
+        e = s
+        while e < n:
+            if _is_sentence_end(text[e]):
+                e += 1
+                break
+            e += 1
+        i = e
+
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if e > s:
+            out.append((s, e))
+    return out
+
+
+def _sentence_cache_key(sentence: str, target_lang: str) -> str:
+    # Cached findings carry step-2 suggestions: the suggest mode shapes them too
+    raw = json.dumps([sentence, target_lang, MODEL, PROMPT_VERSION, settings.llm_suggest_mode], ensure_ascii=False)
+    return "sentence:" + hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def llm_scan_incremental(text: str, language: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Same output as llm_scan, but memoized per sentence:
+    - findings of already-seen sentences come from cache (offsets sentence-relative)
+    - only new/changed sentences go to the model, joined into one step-1 call
+    - offsets are re-based into the full text
+    """
+    target_lang = _target_lang(language)
+    usage = budget.begin_request()
+    spans = _split_sentences(text)
+
+    cached: Dict[str, List[Dict[str, Any]]] = {}
+    missing: Dict[str, str] = {}  # key -> sentence (dedup repeated sentences)
+    keys: List[str] = []
+    for s, e in spans:
+        sent = text[s:e]
+        key = _sentence_cache_key(sent, target_lang)
+        keys.append(key)
+        if key in cached or key in missing:
+            continue
+        hit = await cache_get_async(key)
+        if hit is None:
+            missing[key] = sent
+        else:
+            cached[key] = hit
+
+    lang_out = language or "auto"
+
+    if missing:
+        # Fully cached texts need no model call, so only these pay the minute budget check
+        _check_minute_budget()
+
+        # One step-1 call over the changed sentences only. "\n" is a sentence
+        # end, so "avoid" expansion never crosses into a neighbouring sentence.
+        miss_keys = list(missing.keys())
+        sub_starts: List[int] = []
+        parts: List[str] = []
+        pos = 0
+        for key in miss_keys:
+            sub_starts.append(pos)
+            parts.append(missing[key])
+            pos += len(missing[key]) + 1
+        sub = "\n".join(parts)
+
+        data, sub_findings = await _llm_detect(sub, target_lang)
+        lang_out = data.get("language") or lang_out
+
+        # Step 2 on the joined text: sentence context is identical to the original
+        await _fill_suggestions(sub, sub_findings, target_lang)
+
+        per_key: Dict[str, List[Dict[str, Any]]] = {k: [] for k in miss_keys}
+        for f in sub_findings:
+            idx = bisect.bisect_right(sub_starts, int(f["start"])) - 1
+            key = miss_keys[idx]
+            sent = missing[key]
+            start = int(f["start"]) - sub_starts[idx]
+            end = min(int(f["end"]) - sub_starts[idx], len(sent))
+            if start >= len(sent) or end <= start:
+                continue
+            f["start"], f["end"] = start, end
+            f["text"] = sent[start:end]
+            per_key[key].append(f)
+
+        for key in miss_keys:
+            cached[key] = per_key[key]
+            # Budget-fallback suggestions are served once, never memoized
+            if not any(budget.fell_back(f) for f in per_key[key]):
+                await cache_set_async(key, copy.deepcopy(per_key[key]), ttl=settings.sentence_cache_ttl)
+
+    findings: List[Dict[str, Any]] = []
+    for (s, _e), key in zip(spans, keys):
+        for f in cached.get(key, []):
+            g = copy.deepcopy(f)
+            g["start"] = int(g["start"]) + s
+            g["end"] = int(g["end"]) + s
+            findings.append(g)
+
+    findings.sort(key=lambda f: (f["start"], f["end"]))
+    for i, f in enumerate(findings):
+        f["id"] = f"f_{i+1:03d}"
+
+    return {"language": lang_out, "findings": findings, "usage": usage.as_dict()}
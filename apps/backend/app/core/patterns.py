@@ -1,6 +1,7 @@
 import re
+from collections import deque
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 @dataclass
 class Match:
@@ -58,11 +59,185 @@ HARD_OFFENSIVE = {
     "niggers",
 }
 
+# Slur -> kısa nötr karşılık (services/llm bu rewrite'ları zorlar).
+# Küçük ve bilinçli tut; gerekirse sonra genişlet.
+FORCED_SPAN_REPLACEMENTS = {
+    # LGBTQ+ slurs -> neutral term (per your product rule)
+    "faggot": "homosexuals",
+    "faggots": "homosexuals",
+    "fag": "homosexuals",
+    "fags": "homosexuals",
+}
+
+# Prefilter'ın "temiz" diyemeyeceği tüm slur'lar
+SLUR_TERMS = HARD_OFFENSIVE | set(FORCED_SPAN_REPLACEMENTS)
+
 
 # Marka/ürün ismi gibi false positive üretme riski olan bazı kelimeler (MVP)
 # İleride NER ile gelişir; şimdilik basit koruma.
 SAFE_ENTITIES = {"apple", "samsung", "google", "microsoft"}
 
+_FOLD: Dict[str, str] = {}
+
+
+def _fold(ch: str) -> str:
+    # Tek karakterlik case-fold: metni kopyalamadan, offset'ler bozulmadan karşılaştırma.
+    # re.I gibi "I"/"ı", "S"/"ſ" eşdeğer sayılır: lower -> upper -> lower.
+    # "İ".lower() iki karakter ("i" + U+0307) -> sre'nin basit eşlemesi gibi "i".
+    f = _FOLD.get(ch)
+    if f is None:
+        f = ch.lower()
+        if len(f) != 1:
+            f = f[0]
+        up = f.upper()
+        if len(up) == 1 and len(up.lower()) == 1:
+            f = up.lower()
+        _FOLD[ch] = f
+    return f
+
+
+def fold(s: str) -> str:
+    """Case-folded s with the same length (TermMatcher's per-character folding)."""
+    return "".join(_FOLD.get(ch) or _fold(ch) for ch in s)
+
+
+_LOWER: Dict[str, str] = {}
+
+
+def _lower(ch: str) -> str:
+    # str.lower() semantiği, tek karakter: "I"/"ı" ayrı kalır (sık != sik).
+    # "İ".lower() iki karakter ("i" + U+0307) -> "i", offset'ler bozulmasın diye.
+    f = _LOWER.get(ch)
+    if f is None:
+        f = ch.lower()
+        if len(f) != 1:
+            f = f[0]
+        _LOWER[ch] = f
+    return f
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _at_word_boundary(text: str, i: int) -> bool:
+    # regex \b ile aynı: i'nin iki yanındaki karakterlerden tam biri "word" ise sınır var
+    before = i > 0 and _is_word_char(text[i - 1])
+    after = i < len(text) and _is_word_char(text[i])
+    return before != after
+
+
+class TermMatcher:
+    """
+    Aho-Corasick automaton over a fixed lexicon, built once.
+    find() scans the text a single time and returns every case-insensitive hit
+    of every term as (start, end), ordered by end offset. Overlapping hits are
+    all reported; with word_boundary=True only hits equivalent to
+    re.search(rf"\b{re.escape(term)}\b", text, re.I) are kept.
+    find_terms() is the same scan, also naming the (folded) term of each hit.
+    lower=True folds like str.lower() instead of re.I (ı and i stay apart).
+    """
+
+    def __init__(self, terms: Iterable[str], word_boundary: bool = True, lower: bool = False):
+        self.word_boundary = word_boundary
+        self._table, self._fold_ch = (_LOWER, _lower) if lower else (_FOLD, _fold)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]  # lengths of terms ending in this state
+        self._terms: List[Tuple[str, ...]] = [()]  # same terms, folded (parallel to _out)
+
+        for term in terms:
+            if term:
+                self._add(term)
+        self._build()
+
+    def _add(self, term: str) -> None:
+        state = 0
+        for ch in term:
+            c = self._fold_ch(ch)
+            nxt = self._goto[state].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][c] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._terms.append(())
+            state = nxt
+        if len(term) not in self._out[state]:
+            self._out[state] += (len(term),)
+            self._terms[state] += (self.fold(term),)
+
+    def fold(self, s: str) -> str:
+        """s folded the way this matcher compares characters (same length)."""
+        table, fold_ch = self._table, self._fold_ch
+        return "".join(table.get(ch) or fold_ch(ch) for ch in s)
+
+    def _build(self) -> None:
+        goto, fail, out, terms = self._goto, self._fail, self._out, self._terms
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and c not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(c, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+                terms[nxt] = terms[nxt] + terms[fail[nxt]]
+
+    def find(self, text: str) -> List[Tuple[int, int]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        fold, fold_get = self._fold_ch, self._table.get
+        hits: List[Tuple[int, int]] = []
+        state = 0
+        for i, ch in enumerate(text):
+            c = fold_get(ch) or fold(ch)
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            for length in out[state]:
+                start = end - length
+                if self.word_boundary and not (
+                    _at_word_boundary(text, start) and _at_word_boundary(text, end)
+                ):
+                    continue
+                hits.append((start, end))
+        return hits
+
+    def find_terms(self, text: str) -> List[Tuple[int, int, str]]:
+        goto, fail, out, terms = self._goto, self._fail, self._out, self._terms
+        fold, fold_get = self._fold_ch, self._table.get
+        hits: List[Tuple[int, int, str]] = []
+        state = 0
+        for i, ch in enumerate(text):
+            c = fold_get(ch) or fold(ch)
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            if not out[state]:
+                continue
+            end = i + 1
+            for length, term in zip(out[state], terms[state]):
+                start = end - length
+                if self.word_boundary and not (
+                    _at_word_boundary(text, start) and _at_word_boundary(text, end)
+                ):
+                    continue
+                hits.append((start, end, term))
+        return hits
+
+
+# Lexicon değişirse (ör. ileride dosyadan yükleme) matcher'ları yeniden kur.
+_TARGET_MATCHER = TermMatcher(TARGET_TERMS_EN | TARGET_TERMS_TR)
+_HARD_OFFENSIVE_MATCHER = TermMatcher(HARD_OFFENSIVE)
+_SLUR_MATCHER = TermMatcher(SLUR_TERMS)
+
+
 def find_word_boundaries(text: str, term: str) -> List[Match]:
     # kelime sınırıyla ara (term'i regex escape)
     pattern = re.compile(rf"\b{re.escape(term)}\b", re.I)
@@ -72,22 +247,10 @@ def find_word_boundaries(text: str, term: str) -> List[Match]:
     return matches
 
 def detect_targets(text: str) -> List[Match]:
-    lowered = text.lower()
-    targets: List[Match] = []
-
-    # SAFE_ENTITIES kapısı: Apple gibi kelimeler "target" sayılmasın
-    for ent in SAFE_ENTITIES:
-        # ent varsa bile target algılamasın diye sadece filter mantığı aşağıda yapılacak
-        pass
-
-    # İngilizce hedef terimler
-    for term in TARGET_TERMS_EN:
-        # "black" hedef kelime olabilir ama renk olarak da geçebilir -> gate later
-        targets.extend(find_word_boundaries(text, term))
-
-    # Türkçe hedef terimler
-    for term in TARGET_TERMS_TR:
-        targets.extend(find_word_boundaries(text, term))
+    # EN + TR hedef terimler tek geçişte (Aho-Corasick), pozisyon sırasıyla.
+    # "black" hedef kelime olabilir ama renk olarak da geçebilir -> gate later
+    targets = [Match(s, e, text[s:e]) for s, e in _TARGET_MATCHER.find(text)]
+    targets.sort(key=lambda m: (m.start, m.end))
 
     # SAFE_ENTITIES geçen target match’lerini çıkar
     filtered = []
@@ -97,6 +260,17 @@ def detect_targets(text: str) -> List[Match]:
         filtered.append(t)
     return filtered
 
+def detect_hard_offensive(text: str) -> List[Match]:
+    hits = [Match(s, e, text[s:e]) for s, e in _HARD_OFFENSIVE_MATCHER.find(text)]
+    hits.sort(key=lambda m: (m.start, m.end))
+    return hits
+
+def detect_slurs(text: str) -> List[Match]:
+    # HARD_OFFENSIVE + FORCED_SPAN_REPLACEMENTS terimleri
+    hits = [Match(s, e, text[s:e]) for s, e in _SLUR_MATCHER.find(text)]
+    hits.sort(key=lambda m: (m.start, m.end))
+    return hits
+
 def looks_like_color_usage(text: str, match: Match) -> bool:
     """
     'black' kelimesi renk olarak mı kullanılmış?
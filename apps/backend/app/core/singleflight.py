@@ -0,0 +1,56 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+# In-process request coalescing: concurrent callers with the same key share one
+# in-flight task. Per worker only (like core/cache), which is where bursts land.
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._calls = 0
+        self._coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs fn() once per key at a time; everyone else awaits the same task.
+        The result object is shared: callers must not mutate it (copy first).
+        """
+        self._calls += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+
+            def _done(t: asyncio.Task, key: str = key) -> None:
+                if self._inflight.get(key) is t:
+                    self._inflight.pop(key, None)
+
+            task.add_done_callback(_done)
+        else:
+            self._coalesced += 1
+
+        # shield: one caller disconnecting must not cancel the others' result
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self._calls,
+            "coalesced": self._coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+_groups: Dict[str, SingleFlight] = {}
+
+
+def group(name: str) -> SingleFlight:
+    sf = _groups.get(name)
+    if sf is None:
+        sf = _groups[name] = SingleFlight()
+    return sf
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    return {name: sf.stats() for name, sf in _groups.items()}
@@ -1,7 +1,14 @@
 # apps/backend/app/db.py
 import os
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+
+from app.core.config import settings
 
 DATABASE_URL = os.getenv("DATABASE_URL", "").strip()
 
@@ -9,20 +16,75 @@ if not DATABASE_URL:
   # Fail fast: better to know immediately in logs
   raise RuntimeError("DATABASE_URL is not set")
 
-engine = create_engine(
-  DATABASE_URL,
+_POOL = dict(
   pool_pre_ping=True,
-  pool_size=5,
-  max_overflow=10,
+  pool_size=settings.db_pool_size,
+  max_overflow=settings.db_max_overflow,
+  pool_timeout=settings.db_pool_timeout,
+  pool_recycle=settings.db_pool_recycle,
 )
 
+# Sync engine: create_all, background jobs (rollups, event buffer flushes), and
+# request handlers when settings.db_async is off
+engine = create_engine(DATABASE_URL, **_POOL)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
-  db = SessionLocal()
+# scheme -> async driver
+_ASYNC_DRIVERS = {
+  "postgres": "postgresql+asyncpg",
+  "postgresql": "postgresql+asyncpg",
+  "postgresql+psycopg2": "postgresql+asyncpg",
+  "sqlite": "sqlite+aiosqlite",
+}
+
+def _async_url(url: str) -> str:
+  scheme, sep, rest = url.partition("://")
+  return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+async_engine = None
+AsyncSessionLocal: Optional[async_sessionmaker] = None
+
+if settings.db_async:
+  # Separate pool from the sync engine, same sizing
+  async_engine = create_async_engine(_async_url(DATABASE_URL), **_POOL)
+  AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+T = TypeVar("T")
+
+class ThreadedSession:
+  """
+  Sync Session behind AsyncSession's run_sync() interface, so handlers are written
+  once: `await db.run_sync(fn, ...)` calls fn(session, ...) in the threadpool here,
+  and on the event loop (asyncpg) with settings.db_async.
+  """
+
+  def __init__(self, session: Session):
+    self.sync_session = session
+
+  async def run_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+  async def close(self) -> None:
+    await run_in_threadpool(self.sync_session.close)
+
+DBSession = Union[AsyncSession, ThreadedSession]
+
+@asynccontextmanager
+async def db_session():
+  if AsyncSessionLocal is not None:
+    async with AsyncSessionLocal() as db:
+      yield db
+    return
+
+  db = ThreadedSession(SessionLocal())
   try:
     yield db
   finally:
-    db.close()
+    await db.close()
+
+async def get_db():
+  async with db_session() as db:
+    yield db
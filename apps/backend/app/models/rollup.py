@@ -0,0 +1,21 @@
+# apps/backend/app/models/rollup.py
+from sqlalchemy import Column, BigInteger, Text, DateTime, LargeBinary
+from app.db import Base
+
+class EventRollupHourly(Base):
+  # One row per (hour, event_name, utm_source); built by services/rollups.py
+  __tablename__ = "event_rollups_hourly"
+
+  bucket = Column(DateTime(timezone=True), primary_key=True)  # hour start, UTC
+  event_name = Column(Text, primary_key=True)
+  utm_source = Column(Text, primary_key=True)  # "" when the event had none
+
+  count = Column(BigInteger, nullable=False)
+  sessions_hll = Column(LargeBinary, nullable=False)  # core/hll.HyperLogLog of session_id
+
+class RollupWatermark(Base):
+  # Every hour before `value` is fully rolled up
+  __tablename__ = "rollup_watermarks"
+
+  name = Column(Text, primary_key=True)
+  value = Column(DateTime(timezone=True), nullable=False)
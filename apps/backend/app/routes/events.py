@@ -1,13 +1,23 @@
 # apps/backend/app/routes/events.py
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Body, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from datetime import datetime
-from app.db import get_db
-from app.schemas.events import EventIn
+from typing import Any, Dict, List
+from app.core.config import settings
+from app.core.metrics import EVENTS_INGESTED
+from app.db import DBSession, db_session, get_db
+from app.schemas.events import EventBatchOut, EventIn, EventRejection
 from app.models.event import Event
+from app.services.event_buffer import EventBuffer
 
 router = APIRouter()
 
+# Clients flush every few seconds; anything bigger than this is a bug or abuse.
+MAX_BATCH = 500
+
 def _parse_ts(ts: str | None):
   if not ts:
     return None
@@ -18,10 +28,9 @@ def _parse_ts(ts: str | None):
   except Exception:
     return None
 
-@router.post("/events")
-def ingest_event(evt: EventIn, db: Session = Depends(get_db)):
+def _event_row(evt: EventIn) -> Dict[str, Any]:
   # IMPORTANT: do NOT store raw user text. Your frontend payload is metadata only.
-  e = Event(
+  return dict(
     event_name=evt.event,
     session_id=evt.session_id,
     ts=_parse_ts(evt.ts),
@@ -36,6 +45,74 @@ def ingest_event(evt: EventIn, db: Session = Depends(get_db)):
 
     payload=evt.payload or {},
   )
-  db.add(e)
+
+def _validation_message(err: ValidationError) -> str:
+  return "; ".join(
+    f"{'.'.join(str(p) for p in e.get('loc', ())) or 'event'}: {e.get('msg')}" for e in err.errors()
+  )
+
+def _insert_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+  # one multi-row INSERT + one commit; runs via db.run_sync (see app/db.py)
+  db.execute(insert(Event).values(rows))
   db.commit()
-  return {"ok": True}
+
+async def _write_rows(rows: List[Dict[str, Any]]) -> None:
+  async with db_session() as db:
+    await db.run_sync(_insert_rows, rows)
+
+async def _flush_buffered(rows: List[Dict[str, Any]]) -> None:
+  await _write_rows(rows)
+  EVENTS_INGESTED.inc(len(rows), path="buffered")
+
+# Started/stopped by main.py (startup/shutdown) when settings.event_buffer_enabled
+event_buffer = EventBuffer(
+  _flush_buffered,
+  max_batch=settings.event_buffer_max_batch,
+  flush_ms=settings.event_buffer_flush_ms,
+  max_size=settings.event_buffer_max_size,
+  put_timeout_ms=settings.event_buffer_put_timeout_ms,
+)
+
+@router.post("/events")
+async def ingest_event(evt: EventIn):
+  row = _event_row(evt)
+
+  if not event_buffer.running:
+    await _write_rows([row])
+    EVENTS_INGESTED.inc(path="direct")
+    return {"ok": True}
+
+  if not await event_buffer.submit(row):
+    # queue full and not draining fast enough -> let the client retry later
+    raise HTTPException(status_code=503, detail="Event buffer full", headers={"Retry-After": "1"})
+
+  return JSONResponse(status_code=202, content={"ok": True, "queued": True})
+
+@router.post("/events/batch", response_model=EventBatchOut)
+async def ingest_events_batch(
+  events: List[Any] = Body(...),
+  db: DBSession = Depends(get_db),
+):
+  """
+  Body: JSON array of EventIn objects.
+  Valid events are written with ONE multi-row INSERT + one commit;
+  invalid ones are skipped and reported by their index in the array.
+  """
+  if len(events) > MAX_BATCH:
+    raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH} events)")
+
+  rows: List[Dict[str, Any]] = []
+  rejected: List[EventRejection] = []
+  for i, raw in enumerate(events):
+    try:
+      evt = EventIn.model_validate(raw)
+    except ValidationError as e:
+      rejected.append(EventRejection(index=i, error=_validation_message(e)))
+      continue
+    rows.append(_event_row(evt))
+
+  if rows:
+    await db.run_sync(_insert_rows, rows)
+    EVENTS_INGESTED.inc(len(rows), path="batch")
+
+  return EventBatchOut(ok=not rejected, accepted=len(rows), rejected=rejected)
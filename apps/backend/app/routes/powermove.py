@@ -1,15 +1,25 @@
 # apps/backend/app/routes/powermove.py
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
 from datetime import datetime, timedelta, timezone
 
-from app.db import get_db
-from app.models.event import Event
+from app.db import DBSession, get_db
 from app.schemas.events import SummaryOut
+from app.services.rollups import window_counts
 
 router = APIRouter()
 
+# SummaryOut field -> event_name
+SUMMARY_COUNTS = {
+  "page_views": "page_view",
+  "text_started": "text_started",
+  "analysis_started": "analysis_started",
+  "analysis_completed": "analysis_completed",
+  "flagged": "flagged_discriminative",
+  "accepted": "suggestion_accepted",
+  "rejected": "suggestion_rejected",
+  "copy_clicked": "copy_clicked",
+}
+
 def _dt(s: str | None):
   if not s:
     return None
@@ -19,8 +29,8 @@ def _dt(s: str | None):
     return None
 
 @router.get("/powermove/summary", response_model=SummaryOut)
-def summary(
-  db: Session = Depends(get_db),
+async def summary(
+  db: DBSession = Depends(get_db),
   # Example: from=2026-01-29T00:00:00Z&to=2026-01-29T23:59:59Z
   from_ts: str | None = Query(default=None, alias="from"),
   to_ts: str | None = Query(default=None, alias="to"),
@@ -29,22 +39,14 @@ def summary(
   start = _dt(from_ts) or (now - timedelta(days=1))
   end = _dt(to_ts) or now
 
-  base = db.query(Event).filter(Event.created_at >= start, Event.created_at <= end)
-
-  # unique sessions in period
-  sessions = base.with_entities(Event.session_id).distinct().count()
-
-  def count(name: str) -> int:
-    return base.filter(Event.event_name == name).count()
+  # Rollups for whole hours (when enabled), raw rows for the rest -> services/rollups
+  by_name, sessions = await db.run_sync(window_counts, start, end, list(SUMMARY_COUNTS.values()))
+  counts = {field: by_name[name] for field, name in SUMMARY_COUNTS.items()}
 
-  page_views = count("page_view")
-  text_started = count("text_started")
-  analysis_started = count("analysis_started")
-  analysis_completed = count("analysis_completed")
-  flagged = count("flagged_discriminative")
-  accepted = count("suggestion_accepted")
-  rejected = count("suggestion_rejected")
-  copy_clicked = count("copy_clicked")
+  analysis_started = counts["analysis_started"]
+  analysis_completed = counts["analysis_completed"]
+  flagged = counts["flagged"]
+  accepted = counts["accepted"]
 
   completion_rate = (analysis_completed / analysis_started) if analysis_started else 0.0
   flag_rate = (flagged / analysis_completed) if analysis_completed else 0.0
@@ -55,14 +57,7 @@ def summary(
     to_ts=end.isoformat(),
 
     sessions=sessions,
-    page_views=page_views,
-    text_started=text_started,
-    analysis_started=analysis_started,
-    analysis_completed=analysis_completed,
-    flagged=flagged,
-    accepted=accepted,
-    rejected=rejected,
-    copy_clicked=copy_clicked,
+    **counts,
 
     completion_rate=float(completion_rate),
     flag_rate=float(flag_rate),
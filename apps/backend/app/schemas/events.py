@@ -1,6 +1,6 @@
 # apps/backend/app/schemas/events.py
 from pydantic import BaseModel, Field
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 class EventIn(BaseModel):
@@ -20,6 +20,15 @@ class EventIn(BaseModel):
 
   payload: Dict[str, Any] = Field(default_factory=dict)
 
+class EventRejection(BaseModel):
+  index: int
+  error: str
+
+class EventBatchOut(BaseModel):
+  ok: bool
+  accepted: int
+  rejected: List[EventRejection] = Field(default_factory=list)
+
 class SummaryOut(BaseModel):
   from_ts: str
   to_ts: str
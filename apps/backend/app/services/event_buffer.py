@@ -0,0 +1,132 @@
+# app/services/event_buffer.py
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+
+
+class EventBuffer:
+    """
+    In-process write-behind buffer for analytics events.
+
+    submit() only enqueues; a background task drains the queue and awaits
+    write_rows(batch) whenever max_batch rows are waiting or flush_ms has
+    passed since the first row of the batch.
+    The queue is bounded: when it is full, submit() waits up to put_timeout_ms
+    and then reports False so the caller can push back (503).
+    stop() flushes everything still queued.
+    """
+
+    def __init__(
+        self,
+        write_rows: Callable[[List[Row]], Awaitable[None]],
+        *,
+        max_batch: int = 200,
+        flush_ms: int = 2000,
+        max_size: int = 10000,
+        put_timeout_ms: int = 100,
+    ):
+        self._write_rows = write_rows
+        self.max_batch = max(1, int(max_batch))
+        self.flush_ms = max(1, int(flush_ms))
+        self.max_size = max(1, int(max_size))
+        self.put_timeout_ms = max(0, int(put_timeout_ms))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+        self._batch: List[Row] = []
+        self._stats = {"queued": 0, "written": 0, "flushes": 0, "rejected": 0, "failed": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        # Queue belongs to the serving event loop -> create it here, not at import
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def submit(self, row: Row) -> bool:
+        if self._queue is None:
+            raise RuntimeError("EventBuffer is not started")
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(row), timeout=self.put_timeout_ms / 1000)
+            except asyncio.TimeoutError:
+                self._stats["rejected"] += 1
+                return False
+        self._stats["queued"] += 1
+        return True
+
+    async def _collect(self) -> List[Row]:
+        # rows are gathered on self._batch so stop() can still write a half-built batch
+        assert self._queue is not None
+        self._batch.append(await self._queue.get())
+        deadline = time.monotonic() + self.flush_ms / 1000
+        while len(self._batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        batch, self._batch = self._batch, []
+        return batch
+
+    async def _flush(self, batch: List[Row]) -> None:
+        try:
+            await self._write_rows(batch)
+        except Exception:
+            self._stats["failed"] += len(batch)
+            logger.exception("event buffer: dropped batch of %d events", len(batch))
+            return
+        self._stats["written"] += len(batch)
+        self._stats["flushes"] += 1
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # shield: stop() cancels _run, but a write already handed to the DB must finish
+            self._flushing = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._flushing)
+
+    async def stop(self) -> None:
+        """Stop the background task and write whatever is still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None:
+            await self._flushing
+            self._flushing = None
+
+        if self._queue is None:
+            return
+        pending, self._batch = self._batch, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for i in range(0, len(pending), self.max_batch):
+            await self._flush(pending[i : i + self.max_batch])
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self._stats,
+            pending=len(self._batch) + (0 if self._queue is None else self._queue.qsize()),
+            running=self.running,
+        )
@@ -1,4 +1,6 @@
-from langdetect import detect, DetectorFactory
+from typing import Optional
+
+from langdetect import detect, detect_langs, DetectorFactory
 
 DetectorFactory.seed = 0
 SUPPORTED = {"en", "de", "lv"}
@@ -12,3 +14,17 @@ def detect_language(text: str) -> str:
         return lang if lang in SUPPORTED else "en"
     except Exception:
         return "en"
+
+def detect_language_code(text: str, min_prob: float = 0.9) -> Optional[str]:
+    """
+    Raw langdetect code (any language, e.g. "tr") when detection is confident,
+    else None. Unlike detect_language, never maps to a supported default.
+    """
+    clean = (text or "").strip()
+    if not clean:
+        return None
+    try:
+        best = detect_langs(clean)[0]
+    except Exception:
+        return None
+    return best.lang if best.prob >= min_prob else None
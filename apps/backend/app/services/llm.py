@@ -7,23 +7,26 @@ import os
 import re
 from typing import Any, Dict, List, Optional
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from app.core import budget
+from app.core.cassette import async_http_client, http_client
+from app.core.config import settings
+from app.core.metrics import LLM_TOKENS
+from app.core.patterns import FORCED_SPAN_REPLACEMENTS
+from app.services.spans import as_span, locate
+
+# http_client: record/replay transport when settings.cassette_mode is on, else SDK default
+client = OpenAI(api_key=settings.openai_api_key, http_client=http_client())
+# Shared async client: one connection pool per worker, never blocks the event loop
+async_client = AsyncOpenAI(api_key=settings.openai_api_key, http_client=async_http_client())
 
 # ------------------------------------------------------------
 # Guardrails / deterministic fallbacks
 # ------------------------------------------------------------
 
-# Minimal deterministic replacements for high-risk terms.
-# Keep this small and intentional; extend later if you want.
-FORCED_SPAN_REPLACEMENTS = {
-    # LGBTQ+ slurs -> neutral term (per your product rule)
-    "faggot": "homosexuals",
-    "faggots": "homosexuals",
-    "fag": "homosexuals",
-    "fags": "homosexuals",
-}
+# Minimal deterministic replacements for high-risk terms: core/patterns.FORCED_SPAN_REPLACEMENTS
+# (shared with the prefilter's slur check).
 
 # For case-insensitive match & preserving capitalization lightly
 def _preserve_case(src: str, repl: str) -> str:
@@ -45,24 +48,15 @@ def _repair_indices(text: str, item: Dict[str, Any]) -> None:
     if not original or not isinstance(original, str):
         return
 
-    start = item.get("start")
-    end = item.get("end")
-
-    try:
-        start_i = int(start)
-        end_i = int(end)
-    except Exception:
-        start_i, end_i = -1, -1
-
     # Already valid and matches
-    if 0 <= start_i <= end_i <= len(text) and text[start_i:end_i] == original:
+    span = as_span(text, item.get("start"), item.get("end"))
+    if span is not None and text[span[0] : span[1]] == original:
         return
 
     # Find first occurrence
-    idx = text.find(original)
-    if idx != -1:
-        item["start"] = idx
-        item["end"] = idx + len(original)
+    span = locate(text, original)
+    if span is not None:
+        item["start"], item["end"] = span
 
 
 def _force_rewrite_if_needed(item: Dict[str, Any]) -> None:
@@ -194,21 +188,59 @@ def _get_model() -> str:
     return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
 
+def _llm_input(text: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": text},
+    ]
+
+
 def analyze_text_with_llm(text: str) -> Dict[str, Any]:
+    """
+    Sync version (blocks the calling thread for the whole round-trip).
+    From async code use analyze_text_with_llm_async instead.
+    """
     if not text or not text.strip():
         return {"is_clean": True, "items": [], "safe_text": text}
 
-    model = _get_model()
+    budget.begin_request()
+    budget.check_minute_budget()
 
     resp = client.responses.create(
-        model=model,
-        input=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": text},
-        ],
+        model=_get_model(),
+        input=_llm_input(text),
+        # Keep compatibility: do not require response_format.
+    )
+    return _postprocess_response(text, resp)
+
+
+async def analyze_text_with_llm_async(text: str) -> Dict[str, Any]:
+    if not text or not text.strip():
+        return {"is_clean": True, "items": [], "safe_text": text}
+
+    budget.begin_request()
+    budget.check_minute_budget()
+
+    resp = await async_client.responses.create(
+        model=_get_model(),
+        input=_llm_input(text),
         # Keep compatibility: do not require response_format.
     )
+    return _postprocess_response(text, resp)
+
+
+def _record_usage(resp: Any) -> None:
+    usage = getattr(resp, "usage", None)
+    if usage is not None:
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        LLM_TOKENS.inc(input_tokens, call="responses", kind="prompt")
+        LLM_TOKENS.inc(output_tokens, call="responses", kind="completion")
+        budget.record(input_tokens, output_tokens)
+
 
+def _postprocess_response(text: str, resp: Any) -> Dict[str, Any]:
+    _record_usage(resp)
     output_text = getattr(resp, "output_text", None)
 
     if not output_text:
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.services.spans import Edit, OccurrenceIndex, apply_edits, as_span
 
 SEVERITY_TO_ACTIONS = {
     "block": ["replace", "keep", "disable_copy"],
@@ -67,21 +68,10 @@ def mask_slur(word: str) -> str:
     return w[0] + stars
 
 
-def find_all_occurrences(text: str, needle: str) -> List[Tuple[int, int]]:
-    if not needle:
-        return []
-    out: List[Tuple[int, int]] = []
-    start = 0
-    while True:
-        idx = text.find(needle, start)
-        if idx == -1:
-            break
-        out.append((idx, idx + len(needle)))
-        start = idx + len(needle)
-    return out
-
-
 def repair_spans(text: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Items whose span doesn't match their original, located together:
+    # one OccurrenceIndex scan for all of them (exact case first, nearest to the hinted start).
+    pending: List[Tuple[Dict[str, Any], str, Optional[int]]] = []
     for it in items:
         original = (it.get("original") or "").strip()
         if not original:
@@ -90,24 +80,21 @@ def repair_spans(text: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]
         start = it.get("start")
         end = it.get("end")
 
-        if isinstance(start, int) and isinstance(end, int) and 0 <= start < end <= len(text):
+        if isinstance(start, int) and isinstance(end, int) and as_span(text, start, end):
             if text[start:end] == original:
                 continue
 
-        occ = find_all_occurrences(text, original)
-        if not occ:
-            lower_text = text.lower()
-            lower_orig = original.lower()
-            occ = find_all_occurrences(lower_text, lower_orig)
-
-        if not occ:
-            continue
+        hint = start if isinstance(start, int) and start >= 0 else None
+        pending.append((it, original, hint))
 
-        if isinstance(start, int) and start >= 0:
-            occ.sort(key=lambda se: abs(se[0] - start))
+    if not pending:
+        return items
 
-        chosen = occ[0]
-        it["start"], it["end"] = chosen[0], chosen[1]
+    index = OccurrenceIndex(text, {original for _, original, _ in pending})
+    for it, original, hint in pending:
+        chosen = index.locate(original, hint)
+        if chosen is not None:
+            it["start"], it["end"] = chosen
 
     return items
 
@@ -234,21 +221,14 @@ def build_safe_text(text: str, items: List[Dict[str, Any]]) -> Optional[str]:
             if not it.get("replacement_text"):
                 return None
 
-    repls: List[Tuple[int, int, str]] = []
+    repls: List[Edit] = []
     for it in items:
-        s, e = it["start"], it["end"]
         replacement = it.get("replacement_text")
         if replacement:
-            repls.append((s, e, replacement))
-
-    if not repls:
-        return text
+            repls.append((it["start"], it["end"], replacement))
 
-    repls.sort(key=lambda x: x[0], reverse=True)
-    out = text
-    for s, e, r in repls:
-        out = out[:s] + r + out[e:]
-    return out
+    # Overlapping items: leftmost-longest wins (see services/spans)
+    return apply_edits(text, repls)
 
 
 def compute_copy_policy(items: List[Dict[str, Any]]) -> Tuple[bool, Optional[str]]:
@@ -0,0 +1,112 @@
+# app/services/prefilter.py
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.core.patterns import (
+    EXCLUSION_PATTERNS,
+    GENERALIZATION_PATTERNS,
+    NORMATIVE_RESTRICTION_PATTERNS,
+    detect_slurs,
+    detect_targets,
+)
+from app.services.language import detect_language_code
+from app.services.rules import get_rule_set, scan_rule_set
+
+logger = logging.getLogger(__name__)
+
+# Languages whose lexicons (core/patterns TARGET_TERMS_*) are good enough to
+# call a text clean. Decided on the language detected in the text, not on the
+# request locale (Turkish text often arrives with the default "en-US").
+# Anything else, or text whose language can't be told, always goes to the LLM.
+GATE_LANGUAGES = {"en", "tr"}
+
+
+@dataclass
+class PrefilterResult:
+    clean: bool
+    reasons: List[str] = field(default_factory=list)
+    lang: Optional[str] = None  # detected language the gate ran with
+    rule_set: Optional[str] = None  # YAML rule set version it was checked against ("en@<digest>")
+
+
+def prefilter(text: str) -> PrefilterResult:
+    """
+    Deterministic gate in front of the LLM.
+    clean=True only when the text's detected language is in GATE_LANGUAGES and
+    none of the cheap detectors fire:
+      - slur lexicon (HARD_OFFENSIVE + FORCED_SPAN_REPLACEMENTS)
+      - group referents (TARGET_TERMS_EN/TR)
+      - exclusion / normative restriction / generalization patterns
+      - YAML rules for the language
+    """
+    lang = detect_language_code(text)
+    if lang not in GATE_LANGUAGES:
+        return PrefilterResult(clean=False, reasons=["unsupported_language"], lang=lang)
+
+    reasons: List[str] = []
+
+    if detect_slurs(text):
+        reasons.append("hard_offensive")
+
+    if detect_targets(text):
+        reasons.append("group_referent")
+
+    if any(p.search(text) for p in EXCLUSION_PATTERNS + NORMATIVE_RESTRICTION_PATTERNS):
+        reasons.append("exclusion")
+
+    if any(p.search(text) for p in GENERALIZATION_PATTERNS):
+        reasons.append("generalization")
+
+    rule_set = get_rule_set(lang)
+    if rule_set is not None and scan_rule_set(rule_set, text):
+        reasons.append("rule")
+
+    version = rule_set.version if rule_set is not None else None
+    return PrefilterResult(clean=not reasons, reasons=reasons, lang=lang, rule_set=version)
+
+
+# -----------------------------------------------------------------------------
+# Shadow mode: compare the gate's decision with the LLM's, never act on it.
+# -----------------------------------------------------------------------------
+_shadow: Dict[str, int] = {
+    "total": 0,
+    "agree_clean": 0,
+    "agree_flagged": 0,
+    "gate_clean_llm_flagged": 0,  # would have been a missed finding
+    "gate_flagged_llm_clean": 0,  # LLM call the gate could not save
+}
+
+
+def record_shadow(result: PrefilterResult, llm_findings: list) -> None:
+    llm_clean = not llm_findings
+    _shadow["total"] += 1
+
+    if result.clean and llm_clean:
+        _shadow["agree_clean"] += 1
+    elif not result.clean and not llm_clean:
+        _shadow["agree_flagged"] += 1
+    elif result.clean:
+        _shadow["gate_clean_llm_flagged"] += 1
+        logger.warning(
+            "prefilter shadow: gate=clean llm=flagged types=%s",
+            sorted({f.get("type") for f in llm_findings if isinstance(f, dict)}),
+        )
+    else:
+        _shadow["gate_flagged_llm_clean"] += 1
+
+    logger.info(
+        "prefilter shadow: gate_clean=%s llm_clean=%s lang=%s rule_set=%s reasons=%s",
+        result.clean,
+        llm_clean,
+        result.lang,
+        result.rule_set,
+        result.reasons,
+    )
+
+
+def shadow_stats() -> Dict[str, int]:
+    return dict(_shadow)
@@ -0,0 +1,239 @@
+# app/services/rollups.py
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, distinct, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.hll import HyperLogLog
+from app.db import SessionLocal
+from app.models.event import Event
+from app.models.rollup import EventRollupHourly, RollupWatermark
+
+logger = logging.getLogger(__name__)
+
+# Hourly rollups of `events`, maintained behind a watermark:
+#   - every hour < watermark has its rows in event_rollups_hourly
+#   - the refresher only closes hours that ended at least rollup_grace_seconds ago,
+#     so rows still sitting in an event buffer / open transaction are not missed
+#   - a rolled-up hour is rewritten (delete + insert) in the same transaction that
+#     moves the watermark, so a crashed or repeated refresh is harmless
+WATERMARK = "events_hourly"
+
+HOUR = timedelta(hours=1)
+
+# Seeded watermark value: nothing rolled up yet
+_UNSET = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _utc(dt: datetime) -> datetime:
+    # SQLite hands back naive datetimes; Postgres timestamptz aware ones
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+def _floor_hour(dt: datetime) -> datetime:
+    return _utc(dt).replace(minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(dt: datetime) -> datetime:
+    floor = _floor_hour(dt)
+    return floor if floor == _utc(dt) else floor + HOUR
+
+
+def get_watermark(db: Session) -> Optional[datetime]:
+    value = db.query(RollupWatermark.value).filter(RollupWatermark.name == WATERMARK).scalar()
+    return None if value is None else _utc(value)
+
+
+def _seed_watermark(db: Session) -> None:
+    # The row must exist before the first FOR UPDATE: locking a missing row locks
+    # nothing, and two workers would both insert it.
+    if db.get(RollupWatermark, WATERMARK) is not None:
+        return
+    try:
+        with db.begin_nested():
+            db.add(RollupWatermark(name=WATERMARK, value=_UNSET))
+    except IntegrityError:
+        pass  # another worker seeded it first
+    db.commit()
+
+
+def _set_watermark(db: Session, value: datetime) -> None:
+    row = db.get(RollupWatermark, WATERMARK)
+    if row is None:
+        db.add(RollupWatermark(name=WATERMARK, value=value))
+    else:
+        row.value = value
+
+
+def _rollup_hour(db: Session, bucket: datetime) -> int:
+    # (event_name, utm_source, session_id) groups: counts sum up, sessions feed the sketch
+    rows = (
+        db.query(Event.event_name, Event.utm_source, Event.session_id, func.count())
+        .filter(Event.created_at >= bucket, Event.created_at < bucket + HOUR)
+        .group_by(Event.event_name, Event.utm_source, Event.session_id)
+        .all()
+    )
+
+    cells: Dict[Tuple[str, str], List] = {}
+    for event_name, utm_source, session_id, n in rows:
+        cell = cells.setdefault((event_name, utm_source or ""), [0, HyperLogLog()])
+        cell[0] += n
+        cell[1].add(session_id)
+
+    db.execute(delete(EventRollupHourly).where(EventRollupHourly.bucket == bucket))
+    if cells:
+        db.execute(
+            insert(EventRollupHourly).values(
+                [
+                    dict(
+                        bucket=bucket,
+                        event_name=event_name,
+                        utm_source=utm_source,
+                        count=n,
+                        sessions_hll=sketch.to_bytes(),
+                    )
+                    for (event_name, utm_source), (n, sketch) in cells.items()
+                ]
+            )
+        )
+    return len(cells)
+
+
+def refresh_rollups(db: Session, now: Optional[datetime] = None, max_hours: Optional[int] = None) -> int:
+    """
+    Rolls up closed hours past the watermark, oldest first, one transaction per hour.
+    Empty stretches are skipped in one step. Returns the number of hours written.
+    """
+    now = _utc(now or datetime.now(timezone.utc))
+    target = _floor_hour(now - timedelta(seconds=settings.rollup_grace_seconds))
+    max_hours = settings.rollup_max_hours_per_run if max_hours is None else max_hours
+
+    _seed_watermark(db)
+
+    done = 0
+    while done < max_hours:
+        # FOR UPDATE (Postgres): several workers may run the refresher, one wins per hour
+        db.query(RollupWatermark).filter(RollupWatermark.name == WATERMARK).with_for_update().all()
+        watermark = get_watermark(db)
+        if watermark is not None and watermark >= target:
+            db.rollback()
+            break
+
+        q = db.query(func.min(Event.created_at)).filter(Event.created_at < target)
+        if watermark is not None:
+            q = q.filter(Event.created_at >= watermark)
+        first = q.scalar()
+
+        if first is None:
+            # nothing left before target: jump over the empty stretch
+            _set_watermark(db, target)
+            db.commit()
+            break
+
+        bucket = _floor_hour(first)
+        _rollup_hour(db, bucket)
+        _set_watermark(db, bucket + HOUR)
+        db.commit()
+        done += 1
+
+    return done
+
+
+def _refresh_once() -> int:
+    db = SessionLocal()
+    try:
+        return refresh_rollups(db)
+    finally:
+        db.close()
+
+
+async def run_refresher() -> None:
+    """Background loop (started from main.py when settings.rollup_enabled)."""
+    while True:
+        try:
+            hours = await run_in_threadpool(_refresh_once)
+            if hours:
+                logger.info("rollups: refreshed %d hour(s)", hours)
+        except Exception:
+            logger.exception("rollups: refresh failed")
+        await asyncio.sleep(settings.rollup_refresh_interval)
+
+
+# -----------------------------------------------------------------------------
+# Reads
+# -----------------------------------------------------------------------------
+def _raw_counts(db: Session, start: datetime, end: datetime, names: Iterable[str]) -> Tuple[Dict[str, int], int]:
+    # Exact, one scan: COUNT(DISTINCT session_id) + COUNT(*) FILTER (...) per name
+    names = list(names)
+    row = (
+        db.query(
+            func.count(distinct(Event.session_id)),
+            *[func.count().filter(Event.event_name == name) for name in names],
+        )
+        .filter(Event.created_at >= start, Event.created_at <= end)
+        .one()
+    )
+    return dict(zip(names, row[1:])), row[0]
+
+
+def window_counts(db: Session, start: datetime, end: datetime, names: Iterable[str]) -> Tuple[Dict[str, int], int]:
+    """
+    Per-event-name counts and distinct sessions in [start, end].
+    Whole hours below the watermark come from event_rollups_hourly (sessions are then
+    an HLL estimate); the partial edges, and everything when rollups are off, the
+    window holds no rolled-up hour or the watermark trails end by more than
+    rollup_max_hours_per_run hours, come from raw rows.
+    """
+    names = list(names)
+    start, end = _utc(start), _utc(end)
+
+    if not settings.rollup_enabled:
+        return _raw_counts(db, start, end, names)
+
+    watermark = get_watermark(db)
+    lo = _ceil_hour(start)
+    hi = _floor_hour(end) if watermark is None else min(_floor_hour(end), watermark)
+    if watermark is None or lo >= hi:
+        return _raw_counts(db, start, end, names)
+    if end - hi > HOUR * settings.rollup_max_hours_per_run:
+        # Refresher lagging or stopped: the raw tail's session ids would all be pulled
+        # into Python for the sketch; count the whole window in SQL instead
+        return _raw_counts(db, start, end, names)
+
+    counts = dict.fromkeys(names, 0)
+    sessions = HyperLogLog()
+
+    cells = (
+        db.query(EventRollupHourly.event_name, EventRollupHourly.count, EventRollupHourly.sessions_hll)
+        .filter(EventRollupHourly.bucket >= lo, EventRollupHourly.bucket < hi)
+        .all()
+    )
+    for event_name, n, sketch in cells:
+        if event_name in counts:
+            counts[event_name] += n
+        sessions.merge(HyperLogLog.from_bytes(sketch))
+
+    # raw edges: [start, lo) and [hi, end]
+    edges = (
+        (Event.created_at >= start) & (Event.created_at < lo),
+        (Event.created_at >= hi) & (Event.created_at <= end),
+    )
+    for edge in edges:
+        for event_name, n in (
+            db.query(Event.event_name, func.count())
+            .filter(edge, Event.event_name.in_(names))
+            .group_by(Event.event_name)
+        ):
+            counts[event_name] += n
+        sessions.update(sid for (sid,) in db.query(Event.session_id).filter(edge).distinct())
+
+    return counts, sessions.count()
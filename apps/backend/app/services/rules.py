@@ -1,8 +1,18 @@
+import hashlib
+import logging
 import os
 import re
+import threading
 import yaml
 from dataclasses import dataclass
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    from re import _parser as _sre_parse  # 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class Rule:
@@ -13,18 +23,47 @@ class Rule:
     patterns: List[re.Pattern]
     suggestions: List[str]
 
+@dataclass
+class CombinedScanner:
+    """
+    All patterns of a rule set compiled into two regexes:
+    - search: one alternation, finds the next position where any pattern matches
+    - probe: one optional lookahead group per pattern, run at that position to
+      get every pattern's match end in a single call
+    """
+    search: re.Pattern
+    probe: re.Pattern
+    groups: List[Tuple[int, Rule]]  # (probe group index, owning rule), in rule/pattern order
+
+@dataclass
+class RuleSet:
+    """Compiled rules of one app/rules/<lang>.yaml, as loaded at (mtime, digest)."""
+    lang: str
+    path: str
+    mtime_ns: int
+    digest: str
+    rules: List[Rule]
+    scanner: Optional[CombinedScanner] = None
+
+    @property
+    def version(self) -> str:
+        return f"{self.lang}@{self.digest[:12]}"
+
+# Process-wide registry: each YAML is parsed/compiled once and re-read only
+# when its mtime changes (and re-compiled only if the content hash changed).
+_registry: Dict[str, RuleSet] = {}
+_registry_lock = threading.Lock()
+
 def _compile_patterns(patterns: List[str]) -> List[re.Pattern]:
     return [re.compile(p, flags=re.IGNORECASE | re.UNICODE) for p in patterns]
 
-def load_rules_for_language(lang: str) -> List[Rule]:
+def _rules_path(lang: str) -> str:
     app_dir = os.path.dirname(os.path.dirname(__file__))  # app/services -> app
     rules_dir = os.path.join(app_dir, "rules")
-    path = os.path.join(rules_dir, f"{lang}.yaml")
-    if not os.path.exists(path):
-        return []
+    return os.path.join(rules_dir, f"{lang}.yaml")
 
-    with open(path, "r", encoding="utf-8") as f:
-        data: Dict[str, Any] = yaml.safe_load(f) or {}
+def _parse_rules(raw: bytes) -> List[Rule]:
+    data: Dict[str, Any] = yaml.safe_load(raw) or {}
 
     out: List[Rule] = []
     for r in data.get("rules", []):
@@ -40,25 +79,123 @@ def load_rules_for_language(lang: str) -> List[Rule]:
         )
     return out
 
-def scan_text(lang: str, text: str) -> List[dict]:
-    rules = load_rules_for_language(lang)
-    findings: List[dict] = []
+# Backreferences / conditionals refer to group numbers that shift once
+# patterns are wrapped into the combined regex.
+_GROUP_REF_RE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+def _can_match_empty(pattern: str) -> bool:
+    try:
+        return _sre_parse.parse(pattern).getwidth()[0] == 0
+    except Exception:
+        return True
 
+def _build_scanner(rules: List[Rule]) -> Optional[CombinedScanner]:
+    """
+    Returns None (caller falls back to per-pattern scanning) when patterns
+    cannot be combined safely: group references, clashing group names, or
+    patterns that can match the empty string (finditer's empty-match rules
+    can't be replayed from the probe).
+    """
+    sources: List[str] = []
+    owners: List[Rule] = []
     for rule in rules:
+        for pat in rule.patterns:
+            if _GROUP_REF_RE.search(pat.pattern) or _can_match_empty(pat.pattern):
+                return None
+            sources.append(pat.pattern)
+            owners.append(rule)
+
+    if not sources:
+        return None
+
+    try:
+        search = re.compile("|".join(f"(?:{p})" for p in sources), flags=re.IGNORECASE | re.UNICODE)
+        probe = re.compile(
+            "".join(f"(?:(?=(?P<_r{i}>{p})))?" for i, p in enumerate(sources)),
+            flags=re.IGNORECASE | re.UNICODE,
+        )
+    except re.error:
+        return None
+
+    groups = [(probe.groupindex[f"_r{i}"], rule) for i, rule in enumerate(owners)]
+    return CombinedScanner(search=search, probe=probe, groups=groups)
+
+def get_rule_set(lang: str) -> Optional[RuleSet]:
+    path = _rules_path(lang)
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _registry.pop(lang, None)
+        return None
+
+    current = _registry.get(lang)
+    if current is not None and current.mtime_ns == mtime_ns:
+        return current
+
+    with _registry_lock:
+        current = _registry.get(lang)
+        if current is not None and current.mtime_ns == mtime_ns:
+            return current
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        if current is not None and current.digest == digest:
+            # touched, not changed
+            current.mtime_ns = mtime_ns
+            return current
+
+        try:
+            rules = _parse_rules(raw)
+        except Exception:
+            if current is None:
+                raise
+            # Half-saved / broken edit: keep serving the last good version,
+            # retry on the next mtime change
+            logger.exception("rules reload failed for %s, keeping %s", path, current.version)
+            current.mtime_ns = mtime_ns
+            return current
+
+        rule_set = RuleSet(
+            lang=lang,
+            path=path,
+            mtime_ns=mtime_ns,
+            digest=digest,
+            rules=rules,
+            scanner=_build_scanner(rules),
+        )
+        _registry[lang] = rule_set
+        return rule_set
+
+def rule_set_version(lang: str) -> Optional[str]:
+    rule_set = get_rule_set(lang)
+    return rule_set.version if rule_set else None
+
+def load_rules_for_language(lang: str) -> List[Rule]:
+    rule_set = get_rule_set(lang)
+    return rule_set.rules if rule_set else []
+
+def _finding(rule_set: RuleSet, rule: Rule, text: str, start: int, end: int) -> dict:
+    return {
+        "rule_id": rule.id,
+        "category": rule.category,
+        "severity": rule.severity,
+        "description": rule.description,
+        "start": start,
+        "end": end,
+        "match": text[start:end],
+        "rule_suggestions": rule.suggestions,
+        "rule_set": rule_set.version,
+    }
+
+def _scan_per_pattern(rule_set: RuleSet, text: str) -> List[dict]:
+    findings: List[dict] = []
+
+    for rule in rule_set.rules:
         for pat in rule.patterns:
             for m in pat.finditer(text):
-                findings.append(
-                    {
-                        "rule_id": rule.id,
-                        "category": rule.category,
-                        "severity": rule.severity,
-                        "description": rule.description,
-                        "start": m.start(),
-                        "end": m.end(),
-                        "match": text[m.start():m.end()],
-                        "rule_suggestions": rule.suggestions,
-                    }
-                )
+                findings.append(_finding(rule_set, rule, text, m.start(), m.end()))
 
     findings.sort(key=lambda x: (x["start"], -(x["end"] - x["start"])))
     filtered: List[dict] = []
@@ -68,3 +205,53 @@ def scan_text(lang: str, text: str) -> List[dict]:
             filtered.append(f)
             last_end = f["end"]
     return filtered
+
+def _scan_combined(rule_set: RuleSet, scanner: CombinedScanner, text: str) -> List[dict]:
+    # Same output as _scan_per_pattern: replays every pattern's own finditer
+    # chain (resume[k] = where pattern k's next match may start, i.e. the end of
+    # its previous one) and keeps leftmost-longest, non-overlapping matches,
+    # ties going to the earlier rule/pattern. The combined search only visits
+    # positions where some pattern matches.
+    filtered: List[dict] = []
+    resume = [0] * len(scanner.groups)
+    last_end = 0
+    pos = 0
+    n = len(text)
+    while pos <= n:
+        m = scanner.search.search(text, pos)
+        if m is None:
+            break
+        start = m.start()
+
+        probe = scanner.probe.match(text, start)
+        best_rule: Optional[Rule] = None
+        best_end = -1
+        for k, (gi, rule) in enumerate(scanner.groups):
+            if resume[k] > start:
+                continue  # inside this pattern's previous match
+            end = probe.end(gi)
+            if end == -1:
+                resume[k] = start + 1
+                continue
+            resume[k] = end
+            if end > best_end:
+                best_rule, best_end = rule, end
+
+        if best_rule is not None and start >= last_end:
+            filtered.append(_finding(rule_set, best_rule, text, start, best_end))
+            last_end = best_end
+        pos = min(resume)
+    return filtered
+
+def scan_rule_set(rule_set: RuleSet, text: str) -> List[dict]:
+    # For callers that also report rule_set.version: one snapshot for both,
+    # a reload in between can't mix versions
+    if rule_set.scanner is not None:
+        return _scan_combined(rule_set, rule_set.scanner, text)
+    return _scan_per_pattern(rule_set, text)
+
+def scan_text(lang: str, text: str) -> List[dict]:
+    rule_set = get_rule_set(lang)
+    if rule_set is None:
+        return []
+    return scan_rule_set(rule_set, text)
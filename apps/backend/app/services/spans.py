@@ -0,0 +1,132 @@
+# app/services/spans.py
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.patterns import TermMatcher
+
+# Span helpers shared by postprocess, services/llm and api/routes.
+#   Span = (start, end), end exclusive, offsets into the original text
+#   Edit = (start, end, replacement)
+# Overlap policy (resolve_overlaps / apply_edits): leftmost-longest.
+#   Edits are taken by start, the longer one first on ties; an edit that
+#   overlaps one already taken is dropped. Equal spans keep the first given.
+
+Span = Tuple[int, int]
+Edit = Tuple[int, int, str]
+
+
+def as_span(text: str, start: Any, end: Any) -> Optional[Span]:
+    """(start, end) as ints if they form a non-empty span inside text, else None."""
+    try:
+        s, e = int(start), int(end)
+    except (TypeError, ValueError):
+        return None
+    if 0 <= s < e <= len(text):
+        return s, e
+    return None
+
+
+def find_all_occurrences(text: str, needle: str) -> List[Span]:
+    """Non-overlapping occurrences of needle, left to right."""
+    if not needle:
+        return []
+    out: List[Span] = []
+    start = 0
+    while True:
+        idx = text.find(needle, start)
+        if idx == -1:
+            break
+        out.append((idx, idx + len(needle)))
+        start = idx + len(needle)
+    return out
+
+
+def nearest(occurrences: Sequence[Span], hint: Optional[int]) -> Optional[Span]:
+    """Occurrence starting closest to hint (first one on ties / without a hint)."""
+    if not occurrences:
+        return None
+    if hint is None or hint < 0:
+        return occurrences[0]
+    return min(occurrences, key=lambda se: abs(se[0] - hint))
+
+
+def locate(text: str, needle: str, hint: Optional[int] = None) -> Optional[Span]:
+    """
+    Span of needle in text: the exact occurrence nearest to hint, else the
+    first one. None when needle doesn't occur.
+    """
+    if not needle:
+        return None
+    if hint is None or hint < 0:
+        idx = text.find(needle)
+        return None if idx == -1 else (idx, idx + len(needle))
+    return nearest(find_all_occurrences(text, needle), hint)
+
+
+class OccurrenceIndex:
+    """
+    Occurrences of a set of needles in one text, found by a single scan
+    (core/patterns.TermMatcher, no word boundaries). Hits are case-insensitive
+    per character with str.lower() semantics (ı and i differ, İ matches i), so
+    offsets always index the text itself and nothing is lowercased per lookup;
+    locate() prefers exact-case hits.
+    """
+
+    def __init__(self, text: str, needles: Iterable[str]):
+        self.text = text
+        self._hits: Dict[str, List[Span]] = {}
+        self._matcher = TermMatcher({n for n in needles if n}, word_boundary=False, lower=True)
+        for s, e, key in self._matcher.find_terms(text):
+            self._hits.setdefault(key, []).append((s, e))
+
+    def occurrences(self, needle: str) -> List[Span]:
+        """Case-insensitive hits of needle, left to right (overlapping ones included)."""
+        return self._hits.get(self._matcher.fold(needle), []) if needle else []
+
+    def locate(self, needle: str, hint: Optional[int] = None) -> Optional[Span]:
+        """Like locate(): exact occurrence nearest to hint, else case-insensitive nearest."""
+        hits = self.occurrences(needle)
+        exact = [se for se in hits if self.text.startswith(needle, se[0])]
+        return nearest(_non_overlapping(exact or hits), hint)
+
+
+def _non_overlapping(spans: List[Span]) -> List[Span]:
+    # str.find-style occurrences (what find_all_occurrences returns) from sorted, possibly overlapping hits
+    out: List[Span] = []
+    for se in spans:
+        if not out or se[0] >= out[-1][1]:
+            out.append(se)
+    return out
+
+
+def resolve_overlaps(edits: Sequence[Edit]) -> List[Edit]:
+    """Non-overlapping subset of edits (leftmost-longest), sorted by start."""
+    ordered = sorted(enumerate(edits), key=lambda ie: (ie[1][0], -(ie[1][1] - ie[1][0]), ie[0]))
+    out: List[Edit] = []
+    last_end = -1
+    for _, edit in ordered:
+        if edit[0] >= last_end:
+            out.append(edit)
+            last_end = edit[1]
+    return out
+
+
+def apply_edits(text: str, edits: Sequence[Edit]) -> str:
+    """
+    text with edits applied, in one pass over the resolved edits (linear in
+    len(text) + total replacement length). Edits outside text are ignored.
+    """
+    valid = [ed for ed in edits if 0 <= ed[0] <= ed[1] <= len(text)]
+    if not valid:
+        return text
+
+    parts: List[str] = []
+    pos = 0
+    for s, e, r in resolve_overlaps(valid):
+        parts.append(text[pos:s])
+        parts.append(r)
+        pos = e
+    parts.append(text[pos:])
+    return "".join(parts)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Lexicon-size scaling of target-term detection.
+
+Compares the per-term regex loop (find_word_boundaries for every term, the old
+detect_targets) with the prebuilt Aho-Corasick TermMatcher on the same text.
+
+  python bench/bench_patterns.py --sizes 60,250,1000,4000 --text-chars 20000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # .../apps/backend
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from app.core.patterns import TARGET_TERMS_EN, TARGET_TERMS_TR, TermMatcher, find_word_boundaries  # noqa: E402
+
+
+def make_lexicon(size: int, rng: random.Random) -> List[str]:
+    base = sorted(TARGET_TERMS_EN | TARGET_TERMS_TR)
+    out = list(base[:size])
+    while len(out) < size:
+        out.append("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    return out
+
+
+def make_text(lexicon: List[str], chars: int, rng: random.Random) -> str:
+    words: List[str] = []
+    n = 0
+    while n < chars:
+        w = rng.choice(lexicon) if rng.random() < 0.1 else "".join(
+            rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9))
+        )
+        if rng.random() < 0.2:
+            w = w.capitalize()
+        words.append(w)
+        n += len(w) + 1
+    return " ".join(words)[:chars]
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark target-term detection vs lexicon size")
+    ap.add_argument("--sizes", default="60,250,1000,4000", help="Comma-separated lexicon sizes")
+    ap.add_argument("--text-chars", type=int, default=20000, help="Text length in characters")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+
+    print(f"text={args.text_chars} chars, best of {args.repeat}")
+    print(f"{'terms':>7} {'regex loop ms':>14} {'automaton ms':>13} {'build ms':>9} {'hits':>6}")
+
+    for size in sizes:
+        lexicon = make_lexicon(size, rng)
+        text = make_text(lexicon, args.text_chars, rng)
+
+        t0 = time.perf_counter()
+        matcher = TermMatcher(lexicon)
+        build = time.perf_counter() - t0
+
+        loop = best_of(lambda: [find_word_boundaries(text, t) for t in lexicon], args.repeat)
+        auto = best_of(lambda: matcher.find(text), args.repeat)
+        hits = len(matcher.find(text))
+
+        print(f"{size:>7} {loop * 1000:>14.1f} {auto * 1000:>13.1f} {build * 1000:>9.1f} {hits:>6}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
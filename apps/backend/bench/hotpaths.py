@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+CPU micro-benchmarks for the deterministic (non-LLM) hot paths.
+
+Every case runs on synthetic inputs of increasing size along one axis
+(text chars, item count or lexicon size). The report shows best-of-N time per
+size and the scaling exponent between consecutive sizes (~1 linear, ~2 quadratic),
+so a stage that scales badly stands out.
+
+  python bench/hotpaths.py                          # run, print table
+  python bench/hotpaths.py --out bench/baseline.json
+  python bench/hotpaths.py --compare bench/baseline.json --threshold 1.25
+  python bench/hotpaths.py --only repair_spans,build_safe_text --quick
+
+--compare exits with 1 when any (case, size) got slower than threshold x baseline.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+import math
+import os
+import platform
+import random
+import string
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # .../apps/backend
+APPS_DIR = BASE_DIR.parent  # .../apps (for api.detectors.rules_mvp)
+for p in (BASE_DIR, APPS_DIR):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+# openai_client / llm build clients at import time; nothing here calls them
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from api.detectors import rules_mvp  # noqa: E402
+from app.core.openai_client import _clamp_findings, _extract_json  # noqa: E402
+from app.core.patterns import TARGET_TERMS_EN, TermMatcher, detect_targets  # noqa: E402
+from app.services import rules  # noqa: E402
+from app.services.postprocess import build_safe_text, normalize_items, repair_spans  # noqa: E402
+
+TEXT_SIZES = [1_000, 10_000, 100_000]
+ITEM_SIZES = [10, 100, 1_000]
+LEXICON_SIZES = [50, 500, 5_000]
+
+# Words the detectors actually fire on, so inputs carry realistic hit density
+HIT_WORDS = sorted(TARGET_TERMS_EN)[:40] + ["guys", "crazy", "manpower", "insane", "man up"]
+
+
+@dataclass
+class Case:
+    name: str
+    axis: str  # text_chars | items | lexicon
+    sizes: List[int]
+    # size -> (prepare, run): prepare() builds fresh args per repeat (untimed), run(*args) is timed
+    build: Callable[[int, random.Random], Tuple[Callable[[], tuple], Callable[..., Any]]]
+
+
+# -----------------------------------------------------------------------------
+# Synthetic corpora
+# -----------------------------------------------------------------------------
+def _filler(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 9)))
+
+
+def make_text(chars: int, rng: random.Random, hit_rate: float = 0.05, vocab: Optional[List[str]] = None) -> str:
+    vocab = vocab or HIT_WORDS
+    words: List[str] = []
+    n = 0
+    while n < chars:
+        w = rng.choice(vocab) if rng.random() < hit_rate else _filler(rng)
+        if rng.random() < 0.1:
+            w = w.capitalize()
+        if rng.random() < 0.08:
+            w += "."
+        words.append(w)
+        n += len(w) + 1
+    return " ".join(words)[:chars]
+
+
+def make_items(text: str, count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """LLM-style items: words from the text, a third with stale offsets, a few case-shifted."""
+    spans: List[Tuple[int, int]] = []
+    pos = 0
+    for w in text.split(" "):
+        if w:
+            spans.append((pos, pos + len(w)))
+        pos += len(w) + 1
+
+    items: List[Dict[str, Any]] = []
+    for i in range(count):
+        s, e = spans[rng.randrange(len(spans))]
+        original = text[s:e]
+        r = rng.random()
+        if r < 0.33:
+            s, e = s + rng.randint(1, 40), e + rng.randint(1, 40)
+        if r > 0.95:
+            original = original.upper()
+        items.append(
+            {
+                "severity": rng.choice(["block", "warn", "info", "bogus"]),
+                "type": rng.choice(["slur", "stereotype", "exclusion", "other", "x"]),
+                "original": original,
+                "start": s,
+                "end": e,
+                "suggestions": ["  option a ", "option b", "", "option c", "option d"],
+                "suggested_rewrite": rng.choice([None, "", "a better phrase"]),
+                "message": "",
+            }
+        )
+    return items
+
+
+def make_findings(text: str, count: int, rng: random.Random) -> List[Dict[str, Any]]:
+    n = len(text)
+    out = []
+    for i in range(count):
+        s = rng.randrange(n)
+        out.append(
+            {
+                "id": f"f_{i:04d}",
+                "type": rng.choice(["replace", "avoid", "review", "other"]),
+                "subtype": rng.choice(["simple", "people", ""]),
+                "start": s,
+                "end": s + rng.randint(1, 30),
+                "message": "",
+                "suggestions": [{"text": "folks"}, "everyone", None],
+                "confidence": rng.choice([0.9, "0.5", "x", 2]),
+            }
+        )
+    return out
+
+
+def make_rule_set(size: int, rng: random.Random) -> Tuple[rules.RuleSet, List[str]]:
+    words = sorted({_filler(rng) + _filler(rng) for _ in range(size * 2)})[:size]
+    per_rule = 5
+    yaml_rules = [
+        {
+            "id": f"bench_{i:05d}",
+            "category": "other",
+            "severity": "medium",
+            "patterns": [rf"\b{w}\b" for w in words[i : i + per_rule]],
+            "suggestions": ["x"],
+        }
+        for i in range(0, len(words), per_rule)
+    ]
+    parsed = rules._parse_rules(json.dumps({"rules": yaml_rules}).encode())
+    rule_set = rules.RuleSet(
+        lang="bench", path="", mtime_ns=0, digest="0" * 64, rules=parsed, scanner=rules._build_scanner(parsed)
+    )
+    return rule_set, words
+
+
+def _scan_rule_set(rule_set: rules.RuleSet, text: str) -> List[dict]:
+    # same dispatch as rules.scan_text, on a rule set that is not in app/rules
+    if rule_set.scanner is not None:
+        return rules._scan_combined(rule_set, rule_set.scanner, text)
+    return rules._scan_per_pattern(rule_set, text)
+
+
+# -----------------------------------------------------------------------------
+# Cases
+# -----------------------------------------------------------------------------
+def _items_case(fn: Callable[[str, List[Dict[str, Any]]], Any], normalized: bool = False):
+    def build(size: int, rng: random.Random):
+        text = make_text(max(2_000, size * 60), rng)
+        items = make_items(text, size, rng)
+        if normalized:
+            items = normalize_items(text, items)
+        # all three mutate their items -> fresh copy per repeat
+        return (lambda: (text, copy.deepcopy(items))), fn
+
+    return build
+
+
+def _text_case(fn: Callable[[str], Any]):
+    def build(size: int, rng: random.Random):
+        text = make_text(size, rng)
+        return (lambda: (text,)), fn
+
+    return build
+
+
+def _clamp_case(size: int, rng: random.Random):
+    text = make_text(max(2_000, size * 60), rng)
+    findings = make_findings(text, size, rng)
+    return (lambda: (text, findings)), _clamp_findings
+
+
+def _extract_json_case(size: int, rng: random.Random):
+    text = make_text(max(2_000, size * 60), rng)
+    payload = json.dumps({"language": "en", "findings": make_findings(text, size, rng)}, ensure_ascii=False)
+    raw = "Here you go:\n```json\n" + payload + "\n```"
+    return (lambda: (raw,)), _extract_json
+
+
+def _lexicon_matcher_case(size: int, rng: random.Random):
+    words = sorted({_filler(rng) + _filler(rng) for _ in range(size * 2)})[:size]
+    text = make_text(20_000, rng, vocab=words)
+    matcher = TermMatcher(words)
+    return (lambda: (text,)), matcher.find
+
+
+def _lexicon_rules_case(size: int, rng: random.Random):
+    rule_set, words = make_rule_set(size, rng)
+    text = make_text(20_000, rng, vocab=words)
+    return (lambda: (rule_set, text)), _scan_rule_set
+
+
+CASES: List[Case] = [
+    Case("normalize_items", "items", ITEM_SIZES, _items_case(normalize_items)),
+    Case("repair_spans", "items", ITEM_SIZES, _items_case(repair_spans)),
+    Case("build_safe_text", "items", ITEM_SIZES, _items_case(build_safe_text, normalized=True)),
+    Case("_clamp_findings", "items", ITEM_SIZES, _clamp_case),
+    Case("_extract_json", "items", ITEM_SIZES, _extract_json_case),
+    Case("rules.scan_text", "text_chars", TEXT_SIZES, _text_case(lambda t: rules.scan_text("en", t))),
+    Case("rules.scan_text[lexicon]", "lexicon", LEXICON_SIZES, _lexicon_rules_case),
+    Case("patterns.detect_targets", "text_chars", TEXT_SIZES, _text_case(detect_targets)),
+    Case("patterns.TermMatcher[lexicon]", "lexicon", LEXICON_SIZES, _lexicon_matcher_case),
+    Case("rules_mvp.find_all", "text_chars", TEXT_SIZES, _text_case(lambda t: rules_mvp.find_all(t, "en"))),
+]
+
+
+# -----------------------------------------------------------------------------
+# Runner
+# -----------------------------------------------------------------------------
+def best_of(prepare: Callable[[], tuple], run: Callable[..., Any], repeat: int, min_time: float) -> float:
+    """Best per-call seconds over `repeat` rounds; each round loops until min_time has passed."""
+    best = float("inf")
+    for _ in range(repeat):
+        calls = 0
+        elapsed = 0.0
+        while calls == 0 or elapsed < min_time:
+            args = prepare()
+            t0 = time.perf_counter()
+            run(*args)
+            elapsed += time.perf_counter() - t0
+            calls += 1
+        best = min(best, elapsed / calls)
+    return best
+
+
+def run_cases(cases: List[Case], repeat: int, min_time: float, seed: int, quick: bool) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for case in cases:
+        sizes = case.sizes[:2] if quick else case.sizes
+        rows = []
+        for size in sizes:
+            rng = random.Random(f"{seed}:{case.name}:{size}")
+            prepare, run = case.build(size, rng)
+            rows.append({"size": size, "seconds": best_of(prepare, run, repeat, min_time)})
+        for prev, cur in zip(rows, rows[1:]):
+            cur["exponent"] = round(
+                math.log(max(cur["seconds"], 1e-12) / max(prev["seconds"], 1e-12)) / math.log(cur["size"] / prev["size"]),
+                2,
+            )
+        results[case.name] = {"axis": case.axis, "rows": rows}
+    return results
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    print(f"{'case':<30} {'axis':<10} {'size':>8} {'ms':>10} {'exp':>6} {'vs base':>8}")
+    for name, res in results.items():
+        base_rows = {r["size"]: r for r in (baseline or {}).get(name, {}).get("rows", [])}
+        for row in res["rows"]:
+            exp = f"{row['exponent']:.2f}" if "exponent" in row else ""
+            base = base_rows.get(row["size"])
+            ratio = f"{row['seconds'] / base['seconds']:.2f}x" if base and base["seconds"] > 0 else ""
+            print(f"{name:<30} {res['axis']:<10} {row['size']:>8} {row['seconds'] * 1000:>10.3f} {exp:>6} {ratio:>8}")
+
+
+def regressions(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    out = []
+    for name, res in results.items():
+        base_rows = {r["size"]: r for r in baseline.get(name, {}).get("rows", [])}
+        for row in res["rows"]:
+            base = base_rows.get(row["size"])
+            if base and base["seconds"] > 0 and row["seconds"] > base["seconds"] * threshold:
+                out.append(f"{name}[{row['size']}]: {row['seconds'] / base['seconds']:.2f}x baseline")
+    return out
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Benchmark deterministic hot paths")
+    ap.add_argument("--only", default="", help="Comma-separated case names (default: all)")
+    ap.add_argument("--repeat", type=int, default=5, help="Rounds per measurement (best is reported)")
+    ap.add_argument("--min-time", type=float, default=0.05, help="Minimum seconds per round")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--quick", action="store_true", help="Only the two smallest sizes per case")
+    ap.add_argument("--out", help="Write results as a JSON baseline")
+    ap.add_argument("--compare", help="Baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25, help="Regression ratio for --compare")
+    args = ap.parse_args()
+
+    only = {x.strip() for x in args.only.split(",") if x.strip()}
+    unknown = only - {c.name for c in CASES}
+    if unknown:
+        ap.error(f"unknown case(s): {', '.join(sorted(unknown))}")
+    cases = [c for c in CASES if not only or c.name in only]
+
+    results = run_cases(cases, args.repeat, args.min_time, args.seed, args.quick)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print_report(results, baseline)
+
+    if args.out:
+        doc = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+            f.write("\n")
+        print(f"\nwrote {args.out}")
+
+    if baseline is not None:
+        bad = regressions(results, baseline, args.threshold)
+        if bad:
+            print(f"\nREGRESSIONS (> {args.threshold:.2f}x):")
+            for line in bad:
+                print("  " + line)
+            return 1
+        print(f"\nno regressions (threshold {args.threshold:.2f}x)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Closed-loop load driver for /api/analyze (or any JSON POST endpoint).
+
+For each concurrency level, N workers send requests back-to-back for --duration
+seconds (after --warmup); reports throughput and p50/p95/p99 latency per level.
+Texts come from tests/cases.json. By default every request gets a unique suffix
+so the result cache and request coalescing don't turn the run into a cache benchmark
+(--allow-cache to measure that instead).
+
+Needs httpx (pinned in requirements.txt; core/cassette uses it too).
+
+Offline, against the OpenAI stub:
+  python bench/openai_stub.py --port 8100 --latency lognormal:600,0.35 &
+  OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=stub uvicorn main:app --port 8000 --workers 2 &
+  python bench/loadtest.py --url http://127.0.0.1:8000/api/analyze --concurrency 1,8,32,128 --duration 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # .../apps/backend
+DEFAULT_CASES = BASE_DIR / "tests" / "cases.json"
+DEFAULT_URL = "http://127.0.0.1:8000/api/analyze"
+
+
+def load_texts(path: Path) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    cases = data.get("cases", data) if isinstance(data, dict) else data
+    texts = [c["text"] for c in cases if isinstance(c, dict) and c.get("text")]
+    if not texts:
+        raise SystemExit(f"no texts in {path}")
+    return texts
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    # nearest rank
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+class Level:
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.cache: Counter = Counter()
+        self.elapsed = 0.0
+
+    def record(self, latency: float, status: Optional[int], x_cache: Optional[str], error: Optional[str]) -> None:
+        if error is not None:
+            self.errors[error] += 1
+            return
+        self.statuses[status] += 1
+        if status is not None and 200 <= status < 300:
+            self.latencies.append(latency)
+        if x_cache:
+            self.cache[x_cache] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        lat = sorted(self.latencies)
+        total = sum(self.statuses.values()) + sum(self.errors.values())
+        return {
+            "concurrency": self.concurrency,
+            "requests": total,
+            "ok": len(lat),
+            "rps": round(len(lat) / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(lat, 50) * 1000, 1),
+            "p95_ms": round(percentile(lat, 95) * 1000, 1),
+            "p99_ms": round(percentile(lat, 99) * 1000, 1),
+            "max_ms": round((lat[-1] if lat else 0.0) * 1000, 1),
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items(), key=lambda kv: str(kv[0]))},
+            "errors": dict(self.errors),
+            "x_cache": dict(self.cache),
+        }
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    url: str,
+    texts: List[str],
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    locale: str,
+    unique: bool,
+    seed: int,
+) -> Level:
+    level = Level(concurrency)
+    rng = random.Random(seed + concurrency)
+    seq = 0
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def worker() -> None:
+        nonlocal seq
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                return
+            text = rng.choice(texts)
+            if unique:
+                seq += 1
+                text = f"{text} [{concurrency}:{seq}]"
+
+            t0 = time.perf_counter()
+            status = x_cache = error = None
+            try:
+                r = await client.post(url, json={"text": text, "locale": locale})
+                status, x_cache = r.status_code, r.headers.get("x-cache")
+            except httpx.HTTPError as e:
+                error = type(e).__name__
+            t1 = time.perf_counter()
+
+            # only requests that started after warmup and finished in the window count
+            if t0 >= measure_from and t1 <= stop_at:
+                level.record(t1 - t0, status, x_cache, error)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    level.elapsed = duration
+    return level
+
+
+def print_row(s: Dict[str, Any]) -> None:
+    errors = sum(s["errors"].values()) + sum(v for k, v in s["statuses"].items() if not k.startswith("2"))
+    print(
+        f"{s['concurrency']:>5} {s['requests']:>8} {s['ok']:>7} {errors:>7} {s['rps']:>8.2f} "
+        f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}"
+    )
+
+
+async def amain(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    texts = load_texts(Path(args.cases))
+    levels = [int(x) for x in args.concurrency.split(",") if x.strip()]
+
+    print(f"{args.url}  duration={args.duration}s warmup={args.warmup}s unique={not args.allow_cache}")
+    print(f"{'conc':>5} {'requests':>8} {'ok':>7} {'errors':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+
+    results = []
+    for concurrency in levels:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+            level = await run_level(
+                client,
+                args.url,
+                texts,
+                concurrency,
+                args.duration,
+                args.warmup,
+                args.locale,
+                not args.allow_cache,
+                args.seed,
+            )
+        s = level.summary()
+        print_row(s)
+        results.append(s)
+        if args.pause:
+            await asyncio.sleep(args.pause)
+    return results
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="Load driver: throughput + latency percentiles per concurrency level")
+    ap.add_argument("--url", default=DEFAULT_URL)
+    ap.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated levels")
+    ap.add_argument("--duration", type=float, default=20.0, help="Measured seconds per level")
+    ap.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds before each level")
+    ap.add_argument("--pause", type=float, default=1.0, help="Seconds between levels")
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--cases", default=str(DEFAULT_CASES), help="JSON with a cases[].text list")
+    ap.add_argument("--locale", default="en-US")
+    ap.add_argument("--allow-cache", action="store_true", help="Reuse texts verbatim (measures cache hits)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", help="Write per-level results as JSON")
+    args = ap.parse_args()
+
+    results = asyncio.run(amain(args))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"url": args.url, "duration": args.duration, "levels": results}, f, indent=2)
+            f.write("\n")
+        print(f"\nwrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
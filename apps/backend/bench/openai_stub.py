@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub for load tests (no API quota, no network).
+
+Implements the two endpoints the backend calls:
+  POST /v1/chat/completions   core/openai_client.py (step 1 detect, step 2 suggestions, batched step 2)
+  POST /v1/responses          services/llm.py
+plus GET /stats (request / injected error counters) and POST /stats/reset.
+
+Findings are derived from the deterministic detectors (app/rules YAML + hard
+offensive list), or canned, or empty. Latency is sampled per call from a
+distribution; 429 / 5xx can be injected at a given rate.
+
+  python bench/openai_stub.py --port 8100 --latency lognormal:600,0.4 --error-429 0.02
+  OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=stub uvicorn main:app --workers 4
+
+Latency specs (ms): fixed:300 | uniform:200,800 | normal:400,80 | lognormal:<median>,<sigma>
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # .../apps/backend
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+import uvicorn  # noqa: E402
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.core.patterns import detect_hard_offensive  # noqa: E402
+from app.services.rules import scan_text  # noqa: E402
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Latency spec -> sampler returning seconds."""
+    kind, _, args = spec.partition(":")
+    nums = [float(x) for x in args.split(",") if x.strip()] if args else []
+    try:
+        if kind == "fixed":
+            (ms,) = nums
+            return lambda rng: ms / 1000
+        if kind == "uniform":
+            lo, hi = nums
+            return lambda rng: rng.uniform(lo, hi) / 1000
+        if kind == "normal":
+            mu, sd = nums
+            return lambda rng: max(0.0, rng.gauss(mu, sd)) / 1000
+        if kind == "lognormal":
+            median, sigma = nums
+            mu = math.log(median)
+            return lambda rng: rng.lognormvariate(mu, sigma) / 1000
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"bad latency spec: {spec!r}")
+
+
+class Stub:
+    def __init__(
+        self,
+        *,
+        latency: Callable[[random.Random], float],
+        suggest_latency: Callable[[random.Random], float],
+        findings: str,
+        canned: Optional[List[Dict[str, Any]]],
+        error_429: float,
+        error_5xx: float,
+        seed: Optional[int],
+    ):
+        self.latency = latency
+        self.suggest_latency = suggest_latency
+        self.findings_mode = findings
+        self.canned = canned
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.rng = random.Random(seed)
+        self.stats: Counter = Counter()
+
+    # -------------------------------------------------------------------------
+    # Findings
+    # -------------------------------------------------------------------------
+    def findings_for(self, text: str, lang: str) -> List[Dict[str, Any]]:
+        if self.findings_mode == "none" or not text.strip():
+            return []
+
+        if self.findings_mode == "canned":
+            if self.canned is not None:
+                return [dict(f) for f in self.canned]
+            m = re.search(r"\w+", text)
+            return [] if m is None else [_finding("f_001", "replace", "simple", m.start(), m.end())]
+
+        out: List[Dict[str, Any]] = []
+        for m in detect_hard_offensive(text):
+            out.append(_finding(f"f_{len(out) + 1:03d}", "replace", "identity_slur", m.start, m.end))
+        for r in scan_text(lang, text):
+            ftype = "avoid" if r.get("severity") == "high" else "replace"
+            out.append(_finding(f"f_{len(out) + 1:03d}", ftype, "simple", r["start"], r["end"]))
+        return out
+
+    # -------------------------------------------------------------------------
+    # Chat completions (core/openai_client.py)
+    # -------------------------------------------------------------------------
+    def chat_content(self, system: str, user: str) -> Tuple[str, str]:
+        """(kind, JSON content) by prompt shape."""
+        if "keys: language, findings" in system:
+            lang = _line_value(user, "Language hint") or "en"
+            text = _between(user, "Text:\n", "\n\nReturn JSON now.")
+            return "detect", json.dumps({"language": lang, "findings": self.findings_for(text, lang)})
+
+        if '"results"' in system:
+            raw = _between(user, "Items:\n", "\n\nReturn JSON now.")
+            try:
+                items = json.loads(raw).get("items", [])
+            except Exception:
+                items = []
+            results = [{"id": it.get("id"), "suggestions": _suggestions(it.get("kind"))} for it in items]
+            return "suggest_batch", json.dumps({"results": results})
+
+        kind = "review" if "reporting violence" in system else "replace"
+        return "suggest", json.dumps({"suggestions": _suggestions(kind)})
+
+    # -------------------------------------------------------------------------
+    # Responses (services/llm.py)
+    # -------------------------------------------------------------------------
+    def responses_content(self, text: str) -> str:
+        items = []
+        for f in self.findings_for(text, "en"):
+            original = text[f["start"] : f["end"]]
+            items.append(
+                {
+                    "type": "slur" if f["subtype"] == "identity_slur" else "other",
+                    "severity": "block" if f["subtype"] == "identity_slur" else "info",
+                    "original": original,
+                    "start": f["start"],
+                    "end": f["end"],
+                    "message": "We recommend revising this wording.",
+                    "suggestions": ["people"],
+                    "suggested_rewrite": "people",
+                }
+            )
+        return json.dumps({"is_clean": not items, "items": items, "safe_text": None})
+
+    # -------------------------------------------------------------------------
+    def injected_error(self) -> Optional[JSONResponse]:
+        r = self.rng.random()
+        if r < self.error_429:
+            self.stats["error_429"] += 1
+            return JSONResponse(
+                status_code=429,
+                content=_error("Rate limit reached (stub)", "rate_limit_error", "rate_limit_exceeded"),
+                headers={"retry-after-ms": "200"},
+            )
+        if r < self.error_429 + self.error_5xx:
+            status = self.rng.choice([500, 502, 503])
+            self.stats[f"error_{status}"] += 1
+            return JSONResponse(status_code=status, content=_error("Upstream error (stub)", "server_error", None))
+        return None
+
+
+def _finding(fid: str, ftype: str, subtype: str, start: int, end: int) -> Dict[str, Any]:
+    return {
+        "id": fid,
+        "type": ftype,
+        "subtype": subtype,
+        "start": start,
+        "end": end,
+        "message": "Consider a more inclusive wording.",
+        "suggestions": [],
+        "confidence": 0.9,
+    }
+
+
+def _suggestions(kind: Optional[str]) -> List[Dict[str, str]]:
+    if kind == "review":
+        return [{"replacement": "This was reported in the news.", "message": "Calmer wording."}]
+    return [
+        {"replacement": "people", "message": "Neutral reference."},
+        {"replacement": "everyone", "message": "Inclusive alternative."},
+    ]
+
+
+def _between(s: str, head: str, tail: str) -> str:
+    i = s.find(head)
+    if i < 0:
+        return s
+    i += len(head)
+    j = s.rfind(tail)
+    return s[i:j] if j >= i else s[i:]
+
+
+def _line_value(s: str, key: str) -> Optional[str]:
+    m = re.search(rf"^{re.escape(key)}:\s*(\S+)", s, flags=re.MULTILINE)
+    return m.group(1) if m else None
+
+
+def _error(message: str, etype: str, code: Optional[str]) -> Dict[str, Any]:
+    return {"error": {"message": message, "type": etype, "param": None, "code": code}}
+
+
+def _tokens(s: str) -> int:
+    return max(1, len(s) // 4)
+
+
+def _content_text(content: Any) -> str:
+    # chat / responses message content: str or [{"type": "...text", "text": "..."}]
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return ""
+
+
+def create_app(stub: Stub) -> FastAPI:
+    app = FastAPI(title="OpenAI stub")
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        system = next((_content_text(m.get("content")) for m in messages if m.get("role") == "system"), "")
+        user = next((_content_text(m.get("content")) for m in reversed(messages) if m.get("role") == "user"), "")
+
+        kind, content = stub.chat_content(system, user)
+        stub.stats[f"chat.{kind}"] += 1
+
+        await asyncio.sleep((stub.latency if kind == "detect" else stub.suggest_latency)(stub.rng))
+        err = stub.injected_error()
+        if err is not None:
+            return err
+
+        prompt_tokens = _tokens(system) + _tokens(user)
+        completion_tokens = _tokens(content)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                    "logprobs": None,
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v1/responses")
+    async def responses(request: Request):
+        body = await request.json()
+        inp = body.get("input")
+        if isinstance(inp, list):
+            text = next((_content_text(m.get("content")) for m in reversed(inp) if m.get("role") == "user"), "")
+        else:
+            text = inp or ""
+
+        content = stub.responses_content(text)
+        stub.stats["responses"] += 1
+
+        await asyncio.sleep(stub.latency(stub.rng))
+        err = stub.injected_error()
+        if err is not None:
+            return err
+
+        input_tokens = _tokens(json.dumps(inp, ensure_ascii=False))
+        output_tokens = _tokens(content)
+        return {
+            "id": f"resp_{uuid.uuid4().hex[:24]}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "status": "completed",
+            "model": body.get("model", "stub"),
+            "output": [
+                {
+                    "type": "message",
+                    "id": f"msg_{uuid.uuid4().hex[:24]}",
+                    "status": "completed",
+                    "role": "assistant",
+                    "content": [{"type": "output_text", "text": content, "annotations": []}],
+                }
+            ],
+            "output_text": content,
+            "usage": {
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        }
+
+    @app.get("/stats")
+    def stats():
+        return dict(stub.stats)
+
+    @app.post("/stats/reset")
+    def stats_reset():
+        stub.stats.clear()
+        return {"ok": True}
+
+    return app
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="OpenAI-compatible stub for load tests")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8100)
+    ap.add_argument("--latency", type=parse_latency, default="lognormal:600,0.35", help="Step-1 / responses latency")
+    ap.add_argument("--suggest-latency", type=parse_latency, default=None, help="Step-2 latency (default: --latency)")
+    ap.add_argument("--findings", choices=["rules", "canned", "none"], default="rules")
+    ap.add_argument("--canned-file", help="JSON list of findings returned for every text (--findings canned)")
+    ap.add_argument("--error-429", type=float, default=0.0, help="Fraction of calls answered 429")
+    ap.add_argument("--error-5xx", type=float, default=0.0, help="Fraction of calls answered 500/502/503")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args()
+
+    canned = None
+    if args.canned_file:
+        with open(args.canned_file, encoding="utf-8") as f:
+            canned = json.load(f)
+
+    stub = Stub(
+        latency=args.latency,
+        suggest_latency=args.suggest_latency or args.latency,
+        findings=args.findings,
+        canned=canned,
+        error_429=args.error_429,
+        error_5xx=args.error_5xx,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(stub), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -8,6 +8,7 @@ from pathlib import Path
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 
 # -----------------------------------------------------------------------------
@@ -42,6 +43,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Cache", "X-Prefilter", "X-Rule-Set"],
 )
 
 # -----------------------------------------------------------------------------
@@ -50,6 +52,11 @@ app.add_middleware(
 _db_init_error = None
 try:
     from app.db import Base, engine  # noqa: E402
+
+    # Models register their tables on Base when imported: load them all before create_all.
+    # Aliased: a bare `import app.models...` would rebind `app`, the FastAPI instance.
+    import app.models.event as _event_models  # noqa: E402,F401
+    import app.models.rollup as _rollup_models  # noqa: E402,F401
 except Exception as e:
     Base = None  # type: ignore
     engine = None  # type: ignore
@@ -98,9 +105,44 @@ except Exception as e:
 if events_router is not None:
     app.include_router(events_router, prefix="/api", tags=["events"])
 
+    from app.core.config import settings  # noqa: E402
+    from app.routes.events import event_buffer  # noqa: E402
+
+    if settings.event_buffer_enabled:
+
+        @app.on_event("startup")
+        async def _startup_event_buffer():
+            await event_buffer.start()
+
+        @app.on_event("shutdown")
+        async def _shutdown_event_buffer():
+            # flush whatever is still queued before the worker exits
+            await event_buffer.stop()
+
 if powermove_router is not None:
     app.include_router(powermove_router, prefix="/api", tags=["powermove"])
 
+# Hourly event rollups (app/services/rollups.py): independent of which routers loaded
+_rollup_task = None
+
+if _db_init_error is None:
+    from app.core.config import settings  # noqa: E402
+
+    if settings.rollup_enabled:
+        import asyncio  # noqa: E402
+
+        from app.services.rollups import run_refresher  # noqa: E402
+
+        @app.on_event("startup")
+        async def _startup_rollups():
+            global _rollup_task
+            _rollup_task = asyncio.create_task(run_refresher())
+
+        @app.on_event("shutdown")
+        async def _shutdown_rollups():
+            if _rollup_task is not None:
+                _rollup_task.cancel()
+
 
 # -----------------------------------------------------------------------------
 # Basic health check
@@ -110,6 +152,16 @@ def health():
     return {"status": "ok"}
 
 
+# -----------------------------------------------------------------------------
+# Prometheus metrics (per worker process, see app/core/metrics.py)
+# -----------------------------------------------------------------------------
+@app.get("/metrics")
+def metrics():
+    from app.core.metrics import CONTENT_TYPE, render  # noqa: E402
+
+    return Response(content=render(), media_type=CONTENT_TYPE)
+
+
 # -----------------------------------------------------------------------------
 # Runtime debug (PROVES which file is running + whether env is visible)
 # -----------------------------------------------------------------------------
@@ -118,6 +170,48 @@ def debug_runtime():
     key = os.getenv("OPENAI_API_KEY")
     db_url = os.getenv("DATABASE_URL")
 
+    try:
+        from app.services.prefilter import shadow_stats  # noqa: E402
+
+        prefilter_shadow = shadow_stats()
+    except Exception as e:
+        prefilter_shadow = repr(e)
+
+    try:
+        from app.core.cache import cache_stats  # noqa: E402
+
+        cache = cache_stats()
+    except Exception as e:
+        cache = repr(e)
+
+    try:
+        from app.core.singleflight import stats as singleflight_stats  # noqa: E402
+
+        singleflight = singleflight_stats()
+    except Exception as e:
+        singleflight = repr(e)
+
+    try:
+        from app.routes.events import event_buffer  # noqa: E402
+
+        events_buffer = event_buffer.stats()
+    except Exception as e:
+        events_buffer = repr(e)
+
+    try:
+        from app.core.cassette import stats as cassette_stats  # noqa: E402
+
+        cassette = cassette_stats()
+    except Exception as e:
+        cassette = repr(e)
+
+    try:
+        from app.core.budget import minute_budget  # noqa: E402
+
+        token_budget = minute_budget.stats()
+    except Exception as e:
+        token_budget = repr(e)
+
     return {
         "main_file": __file__,
         "cwd": os.getcwd(),
@@ -133,4 +227,10 @@ def debug_runtime():
         "powermove_router_import_error": _powermove_router_import_error,
         "db_init_error": _db_init_error,
         "pythonpath_has_basedir": str(BASE_DIR) in sys.path,
+        "prefilter_shadow": prefilter_shadow,
+        "singleflight": singleflight,
+        "cache": cache,
+        "event_buffer": events_buffer,
+        "cassette": cassette,
+        "token_budget": token_budget,
     }
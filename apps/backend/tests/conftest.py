@@ -0,0 +1,46 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import BigInteger
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.compiler import compiles
+
+BASE_DIR = Path(__file__).resolve().parents[1]  # .../apps/backend
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+# app.core.openai_client / services.llm build their clients at import time
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+# app.db needs DATABASE_URL at import; without one the DB tests run on a throwaway SQLite file
+_DB_DIR = tempfile.mkdtemp(prefix="equaltype-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_DIR}/test.sqlite3")
+
+
+# Postgres column types used by app.models, rendered for SQLite
+@compiles(JSONB, "sqlite")
+def _jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(BigInteger, "sqlite")
+def _bigint_sqlite(type_, compiler, **kw):
+    # INTEGER PRIMARY KEY is SQLite's autoincrement rowid
+    return "INTEGER"
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def db_tables():
+    """Fresh tables of every model on the test database; yields the sync engine."""
+    from app.db import Base, engine
+    import app.models.event  # noqa: F401
+    import app.models.rollup  # noqa: F401
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,34 @@
+from app.api import routes
+from app.core.config import settings
+
+
+def test_key_is_stable_for_same_input():
+    assert routes._analyze_cache_key("Some text.", "en") == routes._analyze_cache_key("Some text.", "en")
+
+
+def test_key_depends_on_text_and_language():
+    key = routes._analyze_cache_key("Some text.", "en")
+    assert routes._analyze_cache_key("Some text. ", "en") != key
+    assert routes._analyze_cache_key("Some text.", "de") != key
+
+
+def test_key_depends_on_suggest_mode(monkeypatch):
+    monkeypatch.setattr(settings, "llm_suggest_mode", "concurrent")
+    concurrent = routes._analyze_cache_key("Some text.", "en")
+    monkeypatch.setattr(settings, "llm_suggest_mode", "batched")
+    assert routes._analyze_cache_key("Some text.", "en") != concurrent
+
+
+def test_key_depends_on_incremental_and_prefilter_mode(monkeypatch):
+    monkeypatch.setattr(settings, "llm_incremental", False)
+    monkeypatch.setattr(settings, "prefilter_mode", "off")
+    base = routes._analyze_cache_key("Some text.", "en")
+
+    monkeypatch.setattr(settings, "llm_incremental", True)
+    incremental = routes._analyze_cache_key("Some text.", "en")
+    assert incremental != base
+
+    monkeypatch.setattr(settings, "llm_incremental", False)
+    monkeypatch.setattr(settings, "prefilter_mode", "enforce")
+    enforce = routes._analyze_cache_key("Some text.", "en")
+    assert enforce not in (base, incremental)
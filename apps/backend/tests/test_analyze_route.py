@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.core.config import settings
+
+
+def test_main_mounts_analyze_router(monkeypatch):
+    import main
+
+    async def fake_scan(text, language=None):
+        start = text.index("crazy")
+        return {"findings": [{"type": "replace", "start": start, "end": start + 5, "suggestions": ["wild"]}]}
+
+    monkeypatch.setattr(settings, "prefilter_mode", "off")
+    monkeypatch.setattr(settings, "analyze_cache_ttl", 0)
+    monkeypatch.setattr(settings, "llm_incremental", False)
+    monkeypatch.setattr(routes, "llm_scan", fake_scan)
+
+    assert main._router_import_error is None
+    paths = {route.path for route in main.app.routes}
+    assert {"/api/analyze", "/api/analyze/stream"} <= paths
+
+    r = TestClient(main.app).post("/api/analyze", json={"text": "That is crazy."})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["overall"] == "replace"
+    assert body["findings"][0]["original"] == "crazy"
+    assert body["findings"][0]["suggested_rewrite"] == "wild"
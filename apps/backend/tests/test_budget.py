@@ -0,0 +1,156 @@
+import asyncio
+import json
+import types
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.core import budget
+from app.core import openai_client as oc
+from app.core.cache import cache_clear, cache_get
+from app.core.config import settings
+
+TEXT = "You are crazy. He is insane. That is lame. She is dumb. They are psycho. It is retarded."
+WORDS = ["crazy", "insane", "lame", "dumb", "psycho", "retarded"]
+CALL_TOKENS = 400  # per model call, below the step-2 estimate for these sentences
+
+
+class FakeCompletions:
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.calls = 0
+
+    async def create(self, model, messages, temperature, **kw):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if "Detect discriminatory" in messages[0]["content"]:
+            text = messages[1]["content"].split("Text:\n", 1)[1].rsplit("\n\nReturn JSON now.", 1)[0]
+            findings = []
+            for i, w in enumerate(w for w in WORDS if w in text):
+                start = text.index(w)
+                findings.append(
+                    {"id": f"f{i}", "type": "replace", "subtype": "simple", "start": start, "end": start + len(w)}
+                )
+            content = json.dumps({"language": "en", "findings": findings})
+        else:
+            content = json.dumps({"suggestions": [{"replacement": "alt", "message": "m"}]})
+        usage = types.SimpleNamespace(prompt_tokens=CALL_TOKENS - 100, completion_tokens=100)
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    fake = FakeCompletions()
+    monkeypatch.setattr(oc, "_client", types.SimpleNamespace(chat=types.SimpleNamespace(completions=fake)))
+    monkeypatch.setattr(settings, "llm_suggest_mode", "concurrent")
+    monkeypatch.setattr(settings, "llm_suggest_concurrency", 4)
+    monkeypatch.setattr(budget.minute_budget, "limit", 0)
+    return fake
+
+
+def test_reserve_counts_calls_in_flight(monkeypatch):
+    monkeypatch.setattr(settings, "llm_request_token_budget", 100)
+    monkeypatch.setattr(budget.minute_budget, "limit", 0)
+
+    async def run():
+        usage = budget.begin_request()
+        assert budget.reserve(60)
+        assert not budget.reserve(60)  # 60 in flight + 60 > 100
+        assert usage.reserved == 60
+        budget.record(30, 10)
+        budget.release(60)
+        assert usage.reserved == 0
+        assert budget.reserve(60)  # 40 used + 60
+        assert not budget.reserve(1)
+
+    asyncio.run(run())
+
+
+def test_reserve_unlimited_but_refused_over_minute_budget(monkeypatch):
+    monkeypatch.setattr(settings, "llm_request_token_budget", 0)
+    monkeypatch.setattr(budget, "minute_budget", budget.MinuteBudget(50))
+
+    async def run():
+        budget.begin_request()
+        assert budget.reserve(10_000)
+        budget.record(40, 20)
+        assert not budget.reserve(1)
+
+    asyncio.run(run())
+
+
+def test_concurrent_step2_stays_within_request_budget(fake_client, monkeypatch):
+    estimate = max(oc._suggest_estimate(s) for s in TEXT.split(". "))
+    assert estimate >= CALL_TOKENS
+    # step 1 + room for two step-2 calls: four in flight used to all start
+    limit = CALL_TOKENS + 2 * estimate + 10
+    monkeypatch.setattr(settings, "llm_request_token_budget", limit)
+
+    out = asyncio.run(oc.llm_scan(TEXT, "en"))
+
+    assert out["usage"]["total_tokens"] <= limit
+    assert out["usage"]["calls"] == 3
+    assert out["usage"]["budget_fallbacks"] == len(WORDS) - 2
+    assert all(f["suggestions"] for f in out["findings"])
+
+
+def test_batched_step2_falls_back_when_the_batch_does_not_fit(fake_client, monkeypatch):
+    monkeypatch.setattr(settings, "llm_suggest_mode", "batched")
+    monkeypatch.setattr(settings, "llm_request_token_budget", CALL_TOKENS + 100)
+
+    out = asyncio.run(oc.llm_scan(TEXT, "en"))
+
+    assert out["usage"]["calls"] == 1
+    assert out["usage"]["total_tokens"] <= CALL_TOKENS + 100
+    assert all(f["suggestions"] for f in out["findings"])
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    return TestClient(app)
+
+
+@pytest.fixture
+def analyze_cache(monkeypatch):
+    monkeypatch.setattr(settings, "prefilter_mode", "off")
+    monkeypatch.setattr(settings, "analyze_cache_ttl", 600)
+    cache_clear()
+    yield
+    cache_clear()
+
+
+@pytest.mark.parametrize("path", ["/api/analyze", "/api/analyze/stream"])
+def test_budget_fallback_results_are_not_cached(fake_client, analyze_cache, monkeypatch, path):
+    monkeypatch.setattr(settings, "llm_incremental", False)
+    monkeypatch.setattr(settings, "llm_request_token_budget", CALL_TOKENS + 10)  # no room for step 2
+    client = _client()
+
+    assert client.post(path, json={"text": TEXT}).status_code == 200
+    assert cache_get(routes._analyze_cache_key(TEXT, "en")) is None
+    r = client.post("/api/analyze", json={"text": TEXT})
+    assert r.headers["x-cache"] == "MISS"
+
+    # budget back: the full result is cached again
+    monkeypatch.setattr(settings, "llm_request_token_budget", 0)
+    client.post(path, json={"text": TEXT})
+    assert client.post("/api/analyze", json={"text": TEXT}).headers["x-cache"] == "HIT"
+
+
+def test_sentence_cache_skips_only_sentences_with_fallbacks(fake_client, analyze_cache, monkeypatch):
+    monkeypatch.setattr(settings, "llm_incremental", True)
+    monkeypatch.setattr(settings, "llm_suggest_concurrency", 1)  # step-2 order = finding order
+    estimate = max(oc._suggest_estimate(s) for s in TEXT.split(". "))
+    monkeypatch.setattr(settings, "llm_request_token_budget", CALL_TOKENS + 2 * estimate + 10)
+
+    out = asyncio.run(oc.llm_scan_incremental(TEXT, "en"))
+    assert out["usage"]["budget_fallbacks"] == len(WORDS) - 2
+
+    sentences = [TEXT[s:e] for s, e in oc._split_sentences(TEXT)]
+    cached = [cache_get(oc._sentence_cache_key(s, "en")) is not None for s in sentences]
+    assert cached == [True, True] + [False] * (len(WORDS) - 2)
+    hit = cache_get(oc._sentence_cache_key(sentences[0], "en"))
+    assert hit[0]["suggestions"][0]["replacement"] == "alt"
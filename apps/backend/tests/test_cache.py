@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.core.cache import CacheBackend, MemoryCache, SQLiteCache, TieredCache
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_items=2)
+    cache.set("a", 1, 60)
+    cache.set("b", 2, 60)
+    assert cache.get("a") == 1
+    cache.set("c", 3, 60)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_memory_cache_byte_limit():
+    cache = MemoryCache(max_items=10, max_bytes=10)
+    cache.set("big", "x" * 50, 60)
+    assert cache.get("big") is None
+
+
+def test_sqlite_cache_roundtrip_and_expiry(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "c.sqlite3"), max_items=10)
+    cache.set("k", {"v": [1, 2]}, 60)
+    cache.set("old", 1, -1)
+    assert cache.get("k") == {"v": [1, 2]}
+    assert cache.get("old") is None
+
+
+def test_sqlite_errors_are_misses(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "c.sqlite3"), max_items=10)
+    cache.set("k", 1, 60)
+    cache._conn.close()
+
+    assert cache.get("k") is None
+    cache.set("k", 2, 60)  # logged, not raised
+    assert cache.stats()["errors"] == 2
+
+
+def test_sqlite_async_io_runs_off_the_event_loop(tmp_path, monkeypatch):
+    cache = SQLiteCache(str(tmp_path / "c.sqlite3"), max_items=10)
+    threads = []
+    get_with_ttl = cache.get_with_ttl
+
+    def spy(key):
+        threads.append(threading.get_ident())
+        return get_with_ttl(key)
+
+    monkeypatch.setattr(cache, "get_with_ttl", spy)
+
+    async def run():
+        await cache.set_async("k", "v", 60)
+        return await cache.get_with_ttl_async("k"), threading.get_ident()
+
+    hit, loop_thread = asyncio.run(run())
+    assert hit[0] == "v"
+    assert threads and threads[0] != loop_thread
+
+
+def test_tiered_cache_promotes_l2_hits(tmp_path):
+    l1 = MemoryCache(max_items=10)
+    l2 = SQLiteCache(str(tmp_path / "c.sqlite3"), max_items=10)
+    l2.set("k", "v", 60)
+    cache = TieredCache(l1, l2)
+
+    hit = asyncio.run(cache.get_with_ttl_async("k"))
+    assert hit[0] == "v"
+    assert l1.get("k") == "v"
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import threading
+
+import httpx
+
+from app.core.cassette import AsyncCassetteTransport, CassetteStore, CassetteTransport, request_key
+
+BODY = {"id": "chatcmpl-1", "choices": [{"message": {"role": "assistant", "content": "{}"}}]}
+
+
+def _request(content="hi", temperature=0):
+    payload = {"model": "m", "messages": [{"role": "user", "content": content}], "temperature": temperature}
+    return httpx.Request("POST", "https://api.openai.com/v1/chat/completions", json=payload)
+
+
+def _upstream(calls):
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json=BODY)
+
+    return httpx.MockTransport(handler)
+
+
+def test_request_key_ignores_base_url_but_not_messages():
+    other_base = httpx.Request("POST", "http://127.0.0.1:8100/v1/chat/completions", content=_request().content)
+    assert request_key(_request()) == request_key(other_base)
+    assert request_key(_request("hi")) != request_key(_request("hello"))
+    assert request_key(_request(temperature=0)) != request_key(_request(temperature=1))
+
+
+def test_record_then_replay(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+    calls = []
+    recorder = CassetteTransport(CassetteStore(path), "record")
+    recorder._inner = _upstream(calls)
+    assert recorder.handle_request(_request()).json() == BODY
+    assert len(calls) == 1
+
+    replayer = CassetteTransport(CassetteStore(path), "replay")
+    replayer._inner = _upstream(calls)
+    hit = replayer.handle_request(_request())
+    assert hit.headers["x-cassette"] == "hit" and hit.json() == BODY
+    miss = replayer.handle_request(_request("something else"))
+    assert miss.status_code == 404 and miss.json()["error"]["code"] == "cassette_miss"
+    assert len(calls) == 1
+
+
+def test_async_record_writes_off_the_event_loop(tmp_path):
+    store = CassetteStore(str(tmp_path / "c.jsonl"))
+    writer_threads = []
+    put = store.put
+
+    def spy(*args):
+        writer_threads.append(threading.get_ident())
+        put(*args)
+
+    store.put = spy
+    transport = AsyncCassetteTransport(store, "record")
+    transport._inner = _upstream([])
+
+    async def run():
+        response = await transport.handle_async_request(_request())
+        return response, threading.get_ident()
+
+    response, loop_thread = asyncio.run(run())
+    assert response.json() == BODY
+    assert writer_threads and writer_threads[0] != loop_thread
+    with open(store.path, encoding="utf-8") as f:
+        assert json.loads(f.readline())["body"] == BODY
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+
+from sqlalchemy import text
+
+from app import db as app_db
+
+
+def test_async_url_maps_drivers():
+    assert app_db._async_url("postgresql://u:p@h/db") == "postgresql+asyncpg://u:p@h/db"
+    assert app_db._async_url("postgres://h/db") == "postgresql+asyncpg://h/db"
+    assert app_db._async_url("sqlite:////tmp/x.db") == "sqlite+aiosqlite:////tmp/x.db"
+
+
+def test_threaded_session_runs_off_the_event_loop():
+    def query(session):
+        return session.execute(text("SELECT 1")).scalar(), threading.get_ident()
+
+    async def run():
+        async with app_db.db_session() as db:
+            assert isinstance(db, app_db.ThreadedSession)
+            return await db.run_sync(query), threading.get_ident()
+
+    (value, worker_thread), loop_thread = asyncio.run(run())
+    assert value == 1
+    assert worker_thread != loop_thread
+
+
+def test_async_engine_runs_on_sqlite():
+    # what settings.db_async builds for a sqlite DATABASE_URL (aiosqlite + greenlet)
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async def run():
+        engine = create_async_engine(app_db._async_url(app_db.DATABASE_URL), **app_db._POOL)
+        try:
+            async with async_sessionmaker(engine)() as db:
+                return await db.run_sync(lambda s: s.execute(text("SELECT 1")).scalar())
+        finally:
+            await engine.dispose()
+
+    assert asyncio.run(run()) == 1
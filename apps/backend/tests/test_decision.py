@@ -0,0 +1,88 @@
+import asyncio
+import json
+import time
+import types
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import decision
+from app.services import llm
+
+TEXT = "He called him a faggot and it was lame."
+DELAY = 0.2
+
+
+def _response():
+    start = TEXT.index("lame")
+    items = [
+        {"type": "slur", "severity": "block", "start": 0, "end": 0, "original": "faggot", "suggestions": []},
+        {"type": "other", "severity": "warn", "start": start, "end": start + 4, "original": "lame",
+         "suggestions": ["weak"]},
+    ]
+    return types.SimpleNamespace(
+        output_text=json.dumps({"items": items}),
+        usage=types.SimpleNamespace(input_tokens=20, output_tokens=10),
+    )
+
+
+class SyncResponses:
+    def create(self, model, input, **kw):
+        time.sleep(DELAY)
+        return _response()
+
+
+class AsyncResponses:
+    async def create(self, model, input, **kw):
+        await asyncio.sleep(DELAY)
+        return _response()
+
+
+@pytest.fixture(autouse=True)
+def fake_clients(monkeypatch):
+    monkeypatch.setattr(llm, "client", types.SimpleNamespace(responses=SyncResponses()))
+    monkeypatch.setattr(llm, "async_client", types.SimpleNamespace(responses=AsyncResponses()))
+
+
+def test_sync_and_async_results_match():
+    sync = decision.analyze_text(TEXT)
+    async_ = asyncio.run(decision.analyze_text_async(TEXT))
+
+    assert async_.model_dump() == sync.model_dump()
+    assert not sync.is_clean
+    assert not sync.copy_allowed
+    slur = sync.items[0]
+    assert (slur.start, slur.end) == (TEXT.index("faggot"), TEXT.index("faggot") + 6)
+    assert slur.suggested_rewrite == "homosexuals"
+
+
+def test_async_path_does_not_block_the_event_loop():
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(DELAY / 20)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        await asyncio.gather(*(decision.analyze_text_async(TEXT) for _ in range(3)))
+        task.cancel()
+        return ticks
+
+    started = time.perf_counter()
+    ticks = asyncio.run(run())
+    # three calls overlapped (not 3 * DELAY) and the loop kept running meanwhile
+    assert time.perf_counter() - started < 2 * DELAY
+    assert ticks >= 5
+
+
+def test_main_serves_analyze_items():
+    import main
+
+    r = TestClient(main.app).post("/api/analyze/items", json={"text": TEXT})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["copy_allowed"] is False
+    assert [it["original"] for it in body["items"]] == ["faggot", "lame"]
@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import events
+from app.services.event_buffer import EventBuffer
+
+
+class FakeWriter:
+    def __init__(self):
+        self.batches = []
+        self.gate = None  # asyncio.Event: writes block until it is set
+
+    async def __call__(self, rows):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.batches.append(list(rows))
+
+
+def _rows(n, start=0):
+    return [{"n": i} for i in range(start, start + n)]
+
+
+def test_flushes_when_max_batch_rows_are_waiting():
+    async def run():
+        writer = FakeWriter()
+        buf = EventBuffer(writer, max_batch=3, flush_ms=60_000)
+        await buf.start()
+        for row in _rows(7):
+            assert await buf.submit(row)
+        await asyncio.sleep(0.05)
+        flushed = list(writer.batches)
+        await buf.stop()
+        return flushed, writer.batches, buf.stats()
+
+    flushed, batches, stats = asyncio.run(run())
+    assert flushed == [_rows(3), _rows(3, 3)]  # the 7th waits for more rows / the timer
+    assert batches == [_rows(3), _rows(3, 3), _rows(1, 6)]  # stop() wrote the rest
+    assert stats["written"] == 7 and stats["pending"] == 0 and not stats["running"]
+
+
+def test_flushes_on_the_timer():
+    async def run():
+        writer = FakeWriter()
+        buf = EventBuffer(writer, max_batch=100, flush_ms=50)
+        await buf.start()
+        for row in _rows(2):
+            await buf.submit(row)
+        await asyncio.sleep(0.01)
+        before = list(writer.batches)
+        await asyncio.sleep(0.15)
+        after = list(writer.batches)
+        await buf.stop()
+        return before, after
+
+    before, after = asyncio.run(run())
+    assert before == []
+    assert after == [_rows(2)]
+
+
+def test_stop_drains_queued_rows_and_waits_for_the_running_write():
+    async def run():
+        writer = FakeWriter()
+        writer.gate = asyncio.Event()
+        buf = EventBuffer(writer, max_batch=2, flush_ms=60_000)
+        await buf.start()
+        for row in _rows(5):
+            await buf.submit(row)
+        await asyncio.sleep(0.01)  # first batch is being written, the rest still queued
+        stopping = asyncio.ensure_future(buf.stop())
+        await asyncio.sleep(0.01)
+        assert not stopping.done()
+        writer.gate.set()
+        await stopping
+        return writer.batches, buf.stats()
+
+    batches, stats = asyncio.run(run())
+    assert batches == [_rows(2), _rows(2, 2), _rows(1, 4)]
+    assert stats["written"] == 5 and stats["pending"] == 0
+
+
+def test_submit_before_start_raises():
+    async def run():
+        await EventBuffer(FakeWriter()).submit({})
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+
+def _client(buf):
+    app = FastAPI()
+    app.include_router(events.router, prefix="/api")
+    app.add_event_handler("startup", buf.start)
+    app.add_event_handler("shutdown", buf.stop)
+    return TestClient(app)
+
+
+def test_ingest_event_answers_202_while_the_buffer_runs(monkeypatch):
+    writer = FakeWriter()
+    buf = EventBuffer(writer, max_batch=10, flush_ms=60_000)
+    monkeypatch.setattr(events, "event_buffer", buf)
+
+    with _client(buf) as client:
+        r = client.post("/api/events", json={"event": "page_view", "session_id": "a"})
+        assert r.status_code == 202
+        assert r.json() == {"ok": True, "queued": True}
+        assert writer.batches == []
+
+    # shutdown flushed it
+    assert [row["event_name"] for row in writer.batches[0]] == ["page_view"]
+
+
+def test_ingest_event_answers_503_when_the_queue_is_full(monkeypatch):
+    writer = FakeWriter()
+    buf = EventBuffer(writer, max_batch=1, flush_ms=60_000, max_size=1, put_timeout_ms=10)
+    monkeypatch.setattr(events, "event_buffer", buf)
+    evt = {"event": "page_view", "session_id": "a"}
+
+    with _client(buf) as client:
+        client.portal.call(_block, writer)
+        assert client.post("/api/events", json=evt).status_code == 202  # taken by the (stuck) write
+        client.portal.call(asyncio.sleep, 0.02)
+        assert client.post("/api/events", json=evt).status_code == 202  # fills the queue
+        r = client.post("/api/events", json=evt)
+        assert r.status_code == 503
+        assert r.headers["retry-after"] == "1"
+        assert buf.stats()["rejected"] == 1
+        client.portal.call(_unblock, writer)
+
+    assert sum(len(b) for b in writer.batches) == 2
+
+
+async def _block(writer):
+    writer.gate = asyncio.Event()
+
+
+async def _unblock(writer):
+    writer.gate.set()
@@ -0,0 +1,67 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import events
+
+
+@pytest.fixture
+def client(db_tables):
+    app = FastAPI()
+    app.include_router(events.router, prefix="/api")
+    return TestClient(app)
+
+
+def _stored():
+    from app.db import SessionLocal
+    from app.models.event import Event
+
+    with SessionLocal() as db:
+        return [(e.event_name, e.session_id) for e in db.query(Event).order_by(Event.id)]
+
+
+def test_mixed_batch_inserts_valid_rows_and_reports_rejections(client):
+    body = [
+        {"event": "page_view", "session_id": "a", "ts": "2026-01-29T12:34:56.000Z"},
+        {"event": "page_view"},  # no session_id
+        "not an event",
+        {"event": "copy_clicked", "session_id": "b", "payload": {"n": 1}},
+        {"event": 5, "session_id": "c"},
+    ]
+    r = client.post("/api/events/batch", json=body)
+
+    assert r.status_code == 200
+    out = r.json()
+    assert out["ok"] is False
+    assert out["accepted"] == 2
+    assert [rej["index"] for rej in out["rejected"]] == [1, 2, 4]
+    assert "session_id" in out["rejected"][0]["error"]
+    assert _stored() == [("page_view", "a"), ("copy_clicked", "b")]
+
+
+def test_all_valid_batch_is_ok(client):
+    r = client.post("/api/events/batch", json=[{"event": "e", "session_id": str(i)} for i in range(3)])
+    assert r.json() == {"ok": True, "accepted": 3, "rejected": []}
+    assert len(_stored()) == 3
+
+
+def test_empty_batch(client):
+    r = client.post("/api/events/batch", json=[])
+    assert r.json() == {"ok": True, "accepted": 0, "rejected": []}
+    assert _stored() == []
+
+
+def test_non_list_body_is_422(client):
+    r = client.post("/api/events/batch", json={"event": "page_view", "session_id": "a"})
+    assert r.status_code == 422
+    assert _stored() == []
+
+
+def test_batch_over_max_is_413(client):
+    body = [{"event": "e", "session_id": "s"}] * (events.MAX_BATCH + 1)
+    r = client.post("/api/events/batch", json=body)
+    assert r.status_code == 413
+    assert _stored() == []
+
+    r = client.post("/api/events/batch", json=body[: events.MAX_BATCH])
+    assert r.json()["accepted"] == events.MAX_BATCH
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+from app.core import budget
+from app.core import openai_client as oc
+from app.core.cache import cache_clear, cache_get
+from app.core.config import settings
+
+WORDS = ["crazy", "lame", "insane"]
+
+
+class FakeCompletions:
+    """Step 1 flags every WORDS occurrence (end pushed `overshoot` chars further); step 2 answers "alt"."""
+
+    def __init__(self, overshoot=0, extra=()):
+        self.overshoot = overshoot
+        self.extra = list(extra)  # (start, end) spans flagged as-is
+        self.detected = []  # texts sent to step 1
+
+    async def create(self, model, messages, temperature, **kw):
+        if "Detect discriminatory" in messages[0]["content"]:
+            text = messages[1]["content"].split("Text:\n", 1)[1].rsplit("\n\nReturn JSON now.", 1)[0]
+            self.detected.append(text)
+            spans = [
+                (i, i + len(w) + self.overshoot)
+                for w in WORDS
+                for i in range(len(text))
+                if text.startswith(w, i)
+            ] + self.extra
+            findings = [{"type": "replace", "subtype": "simple", "start": s, "end": e} for s, e in spans]
+            content = json.dumps({"language": "en", "findings": findings})
+        else:
+            content = json.dumps({"suggestions": [{"replacement": "alt", "message": "m"}]})
+        usage = types.SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    monkeypatch.setattr(settings, "llm_suggest_mode", "concurrent")
+    monkeypatch.setattr(settings, "llm_request_token_budget", 0)
+    monkeypatch.setattr(budget.minute_budget, "limit", 0)
+    cache_clear()
+    completions = FakeCompletions()
+    monkeypatch.setattr(oc, "_client", types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)))
+    yield completions
+    cache_clear()
+
+
+def _scan(text):
+    return asyncio.run(oc.llm_scan_incremental(text, "en"))
+
+
+def _spans(text, out):
+    return [(f["start"], f["end"], text[f["start"] : f["end"]]) for f in out["findings"]]
+
+
+def test_changed_sentences_go_to_one_newline_joined_call(fake):
+    text = "You are crazy.   That is lame!\nFine."
+    out = _scan(text)
+
+    assert fake.detected == ["You are crazy.\nThat is lame!\nFine."]
+    assert _spans(text, out) == [(8, 13, "crazy"), (25, 29, "lame")]
+    assert [f["text"] for f in out["findings"]] == ["crazy", "lame"]
+    assert [f["id"] for f in out["findings"]] == ["f_001", "f_002"]
+    assert all(f["suggestions"][0]["replacement"] == "alt" for f in out["findings"])
+
+
+def test_repeated_sentences_are_sent_once_and_rebased_each_time(fake):
+    text = "It is lame. It is lame. It is lame."
+    out = _scan(text)
+
+    assert fake.detected == ["It is lame."]
+    assert _spans(text, out) == [(6, 10, "lame"), (18, 22, "lame"), (30, 34, "lame")]
+    assert len({f["id"] for f in out["findings"]}) == 3
+
+
+def test_partly_cached_text_only_sends_new_sentences(fake):
+    _scan("A is crazy. B is fine.")
+    fake.detected.clear()
+
+    text = "B is fine. A is crazy. C is insane."
+    out = _scan(text)
+
+    assert fake.detected == ["C is insane."]
+    assert _spans(text, out) == [(16, 21, "crazy"), (28, 34, "insane")]
+
+
+def test_fully_cached_text_needs_no_call(fake):
+    _scan("A is crazy.")
+    fake.detected.clear()
+    out = _scan("A is crazy.")
+    assert fake.detected == []
+    assert out["usage"]["calls"] == 0
+    assert _spans("A is crazy.", out) == [(5, 10, "crazy")]
+
+
+def test_end_is_clamped_to_its_sentence(fake):
+    fake.overshoot = 4  # "lame." + "\nOk" in the joined text
+    text = "That is lame.  Ok then."
+    out = _scan(text)
+
+    assert fake.detected == ["That is lame.\nOk then."]
+    assert _spans(text, out) == [(8, 13, "lame.")]
+
+
+def test_finding_on_the_separator_is_dropped(fake):
+    fake.extra = [(11, 12)]  # the "\n" between "A is crazy." and "B is fine."
+    text = "A is crazy. B is fine."
+    out = _scan(text)
+
+    assert fake.detected == ["A is crazy.\nB is fine."]
+    assert _spans(text, out) == [(5, 10, "crazy")]
+
+
+def test_sentence_key_depends_on_suggest_mode(fake, monkeypatch):
+    key = oc._sentence_cache_key("A is crazy.", "en")
+    monkeypatch.setattr(settings, "llm_suggest_mode", "batched")
+    assert oc._sentence_cache_key("A is crazy.", "en") != key
+
+    _scan("A is crazy.")
+    assert cache_get(oc._sentence_cache_key("A is crazy.", "en")) is not None
+    assert cache_get(key) is None
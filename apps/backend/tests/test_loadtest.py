@@ -0,0 +1,29 @@
+import sys
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "bench"))
+
+from loadtest import DEFAULT_URL, percentile  # noqa: E402
+
+
+def test_nearest_rank_percentiles():
+    values = [float(i) for i in range(1, 101)]  # 1..100
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile(values, 100) == 100.0
+
+
+def test_small_samples():
+    assert percentile([], 95) == 0.0
+    assert percentile([7.0], 1) == 7.0
+    assert percentile([1.0, 2.0], 50) == 1.0
+    assert percentile([1.0, 2.0], 51) == 2.0
+
+
+def test_default_target_is_served_by_main():
+    import main
+
+    route = next(r for r in main.app.routes if getattr(r, "path", None) == urlparse(DEFAULT_URL).path)
+    assert "POST" in route.methods
@@ -0,0 +1,103 @@
+import asyncio
+import types
+
+import httpx
+import openai
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import openai_client as oc
+from app.core.metrics import CONTENT_TYPE, LLM_ERRORS, LLM_TOKENS, Counter, Histogram
+
+
+def test_histogram_renders_cumulative_buckets_and_inf():
+    h = Histogram("t_seconds", "Test.", ["stage"], buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 0.5, 7.0):
+        h.observe(v, stage="a")
+
+    assert h.render() == [
+        "# HELP t_seconds Test.",
+        "# TYPE t_seconds histogram",
+        't_seconds_bucket{stage="a",le="0.1"} 1',
+        't_seconds_bucket{stage="a",le="1"} 3',
+        't_seconds_bucket{stage="a",le="+Inf"} 4',
+        't_seconds_sum{stage="a"} 8.05',
+        't_seconds_count{stage="a"} 4',
+    ]
+    assert h.count(stage="a") == 4
+
+
+def test_histogram_time_observes_when_the_block_raises():
+    h = Histogram("t2_seconds", "Test.", ["stage"])
+    with pytest.raises(RuntimeError):
+        with h.time(stage="x"):
+            raise RuntimeError
+    assert h.count(stage="x") == 1
+
+
+def test_counter_escapes_label_values():
+    c = Counter("t_total", "Test.", ["v"])
+    c.inc(v='a"b\\c\nd')
+    c.inc(2, v="plain")
+    assert c.render()[2:] == ['t_total{v="a\\"b\\\\c\\nd"} 1', 't_total{v="plain"} 2']
+
+
+def test_mismatched_labels_raise():
+    c = Counter("t3_total", "Test.", ["call", "kind"])
+    with pytest.raises(ValueError):
+        c.inc(call="x")
+    with pytest.raises(ValueError):
+        c.inc(call="x", kind="y", extra="z")
+    with pytest.raises(ValueError):
+        Histogram("t3_seconds", "Test.", ["stage"]).observe(1.0)
+
+
+def test_metrics_endpoint_serves_the_text_format():
+    import main
+
+    r = TestClient(main.app).get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == CONTENT_TYPE
+    assert "# TYPE equaltype_stage_seconds histogram" in r.text
+
+
+class FakeCompletions:
+    def __init__(self, error=None):
+        self.error = error
+
+    async def create(self, model, messages, temperature, **kw):
+        if self.error is not None:
+            raise self.error
+        usage = types.SimpleNamespace(prompt_tokens=7, completion_tokens=3)
+        message = types.SimpleNamespace(content="{}")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+
+def _chat(monkeypatch, completions, call):
+    monkeypatch.setattr(oc, "_client", types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)))
+    return asyncio.run(oc._chat(call, [{"role": "user", "content": "hi"}]))
+
+
+def test_chat_counts_tokens(monkeypatch):
+    before = (LLM_TOKENS.value(call="detect", kind="prompt"), LLM_TOKENS.value(call="detect", kind="completion"))
+    assert _chat(monkeypatch, FakeCompletions(), "detect") == "{}"
+    assert LLM_TOKENS.value(call="detect", kind="prompt") == before[0] + 7
+    assert LLM_TOKENS.value(call="detect", kind="completion") == before[1] + 3
+
+
+_REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+@pytest.mark.parametrize(
+    "error, status",
+    [
+        (openai.APIStatusError("boom", response=httpx.Response(503, request=_REQUEST), body=None), "503"),
+        (openai.APITimeoutError(request=_REQUEST), "timeout"),
+        (openai.APIConnectionError(request=_REQUEST), "connection"),
+    ],
+)
+def test_chat_counts_errors(monkeypatch, error, status):
+    before = LLM_ERRORS.value(call="suggest", status=status)
+    with pytest.raises(type(error)):
+        _chat(monkeypatch, FakeCompletions(error), "suggest")
+    assert LLM_ERRORS.value(call="suggest", status=status) == before + 1
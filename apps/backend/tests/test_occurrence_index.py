@@ -0,0 +1,61 @@
+import random
+
+from app.services.postprocess import repair_spans
+from app.services.spans import OccurrenceIndex, find_all_occurrences, nearest
+
+
+def _lower_locate(text, needle, hint):
+    # repair_spans before OccurrenceIndex: exact occurrences, else on text.lower()
+    occ = find_all_occurrences(text, needle) or find_all_occurrences(text.lower(), needle.lower())
+    return nearest(occ, hint)
+
+
+def test_dotless_i_is_not_i():
+    text = "Bu ürün sık bozuluyor, kırık geldi."
+    index = OccurrenceIndex(text, ["sik", "kirik", "SIK", "kırık"])
+    assert index.occurrences("sik") == []
+    assert index.locate("kirik") is None
+    assert index.locate("SIK") is None  # "I".lower() is "i", not "ı"
+    assert index.locate("kırık") == (23, 28)
+
+
+def test_dotted_capital_i_matches_i_and_keeps_offsets():
+    text = "Dün İstanbul'a, yarın İzmir'e."
+    index = OccurrenceIndex(text, ["istanbul", "izmir", "İZMİR"])
+    assert index.locate("istanbul") == (4, 12)
+    assert text[22:27] == "İzmir"
+    assert index.locate("izmir") == (22, 27)
+    assert index.locate("İZMİR") == (22, 27)
+
+
+def test_locate_prefers_exact_case_then_nearest():
+    text = "Crazy, crazy, CRAZY"
+    index = OccurrenceIndex(text, ["crazy", "CRAZY", "Crazy"])
+    assert index.locate("crazy") == (7, 12)
+    assert index.locate("CRAZY", hint=0) == (14, 19)
+    assert index.occurrences("crazy") == [(0, 5), (7, 12), (14, 19)]
+    assert OccurrenceIndex(text, []).locate("crazy") is None
+
+
+def test_repair_spans_turkish():
+    text = "Bu ürün sık bozuluyor. İstanbul'da kırık geldi."
+    items = [
+        {"original": "sik", "start": 0, "end": 3},
+        {"original": "istanbul", "start": 0, "end": 8},
+        {"original": "kırık", "start": 99, "end": 104},
+    ]
+    repair_spans(text, items)
+    assert (items[0]["start"], items[0]["end"]) == (0, 3)  # not found: left as is
+    assert text[items[1]["start"] : items[1]["end"]] == "İstanbul"
+    assert text[items[2]["start"] : items[2]["end"]] == "kırık"
+
+
+def test_matches_lowercase_search_when_lower_keeps_length():
+    rng = random.Random(7)
+    alphabet = "aAbBıIiş Ş"
+    for _ in range(2000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 14)))
+        needle = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 3)))
+        hint = rng.choice([None, rng.randint(0, 14)])
+        got = OccurrenceIndex(text, [needle]).locate(needle, hint)
+        assert got == _lower_locate(text, needle, hint), (text, needle, hint)
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+
+def test_summary_router_counts_events(db_tables):
+    from app.db import SessionLocal
+    from app.models.event import Event
+    from app.routes.powermove import router
+
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        for name, session_id in [
+            ("page_view", "a"),
+            ("page_view", "b"),
+            ("analysis_started", "a"),
+            ("analysis_completed", "a"),
+            ("flagged_discriminative", "a"),
+            ("suggestion_accepted", "a"),
+            ("copy_clicked", "c"),
+        ]:
+            db.add(Event(event_name=name, session_id=session_id, ts=now, created_at=now))
+        db.commit()
+
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    r = TestClient(app).get(
+        "/api/powermove/summary",
+        params={"from": (now - timedelta(hours=1)).isoformat(), "to": (now + timedelta(minutes=1)).isoformat()},
+    )
+
+    assert r.status_code == 200
+    body = r.json()
+    assert body["sessions"] == 3
+    assert body["page_views"] == 2
+    assert body["analysis_started"] == 1 and body["analysis_completed"] == 1
+    assert body["completion_rate"] == 1.0
+    assert body["accept_rate_given_flagged"] == 1.0
+
+
+def test_main_mounts_powermove_router():
+    import main
+
+    assert main._powermove_router_import_error is None
+    assert "/api/powermove/summary" in {route.path for route in main.app.routes}
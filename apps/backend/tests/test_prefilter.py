@@ -0,0 +1,98 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.core.config import settings
+from app.services import prefilter as pf
+
+
+def test_plain_english_text_is_clean():
+    result = pf.prefilter("The meeting moved to Thursday afternoon.")
+    assert result.clean
+    assert result.lang == "en"
+
+
+def test_turkish_text_is_gated_as_turkish():
+    result = pf.prefilter("Toplantı perşembe öğleden sonraya taşındı.")
+    assert result.lang == "tr"
+
+
+def test_turkish_target_term_is_flagged():
+    result = pf.prefilter("Kadınlar bu toplantıya gelmesin.")
+    assert not result.clean
+    assert "group_referent" in result.reasons
+
+
+def test_forced_replacement_slurs_are_not_clean():
+    for term in ("faggot", "Fags"):
+        result = pf.prefilter(f"He called the new colleague a {term} yesterday.")
+        assert not result.clean
+        assert "hard_offensive" in result.reasons
+
+
+def test_undetectable_language_is_not_gated():
+    result = pf.prefilter("1234 5678")
+    assert not result.clean
+    assert result.reasons == ["unsupported_language"]
+
+
+def test_stream_records_shadow_stats(monkeypatch):
+    async def fake_stream(text, language=None):
+        yield {"event": "findings", "findings": []}
+        yield {"event": "done", "language": language, "findings": []}
+
+    monkeypatch.setattr(settings, "prefilter_mode", "shadow")
+    monkeypatch.setattr(settings, "analyze_cache_ttl", 0)
+    monkeypatch.setattr(routes, "llm_scan_stream", fake_stream)
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    before = pf.shadow_stats()["total"]
+    r = TestClient(app).post("/api/analyze/stream", json={"text": "The meeting moved to Thursday afternoon."})
+
+    assert r.status_code == 200
+    assert "event: summary" in r.text
+    stats = pf.shadow_stats()
+    assert stats["total"] == before + 1
+
+
+def test_result_carries_rule_set_version():
+    from app.services.rules import rule_set_version
+
+    result = pf.prefilter("The meeting moved to Thursday afternoon.")
+    assert result.rule_set == rule_set_version("en")
+    assert result.rule_set.startswith("en@")
+
+
+def test_analyze_reports_rule_set_header(monkeypatch):
+    monkeypatch.setattr(settings, "prefilter_mode", "enforce")
+    monkeypatch.setattr(settings, "analyze_cache_ttl", 0)
+
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    r = TestClient(app).post("/api/analyze", json={"text": "The meeting moved to Thursday afternoon."})
+
+    assert r.status_code == 200
+    assert r.headers["x-prefilter"] == "clean"
+    assert r.headers["x-rule-set"].startswith("en@")
+
+
+def test_rule_set_version_comes_from_the_scanned_snapshot(monkeypatch):
+    import dataclasses
+
+    from app.services import rules
+
+    current = rules.get_rule_set("en")
+    reloaded = dataclasses.replace(current, digest="f" * 64)
+    snapshots = iter([current, reloaded])
+    monkeypatch.setattr(pf, "get_rule_set", lambda lang: next(snapshots))
+
+    result = pf.prefilter("The meeting moved to Thursday afternoon.")
+    assert result.rule_set == current.version  # not the reload that happened afterwards
+
+
+def test_rule_set_header_is_exposed_to_browsers():
+    import main
+
+    r = TestClient(main.app).get("/health", headers={"Origin": "http://localhost:3000"})
+    assert "X-Rule-Set" in r.headers["access-control-expose-headers"].split(", ")
@@ -0,0 +1,87 @@
+import random
+
+from app.services import rules
+from app.services.rules import Rule, RuleSet
+
+
+def _rule_set(pattern_lists):
+    compiled = [
+        Rule(
+            id=f"r{i}",
+            category="other",
+            severity="low",
+            description="",
+            patterns=rules._compile_patterns(patterns),
+            suggestions=[],
+        )
+        for i, patterns in enumerate(pattern_lists)
+    ]
+    return RuleSet(
+        lang="xx",
+        path="",
+        mtime_ns=0,
+        digest="0" * 64,
+        rules=compiled,
+        scanner=rules._build_scanner(compiled),
+    )
+
+
+def _spans(findings):
+    return [(f["start"], f["end"], f["rule_id"]) for f in findings]
+
+
+def _assert_same(pattern_lists, text):
+    rule_set = _rule_set(pattern_lists)
+    expected = _spans(rules._scan_per_pattern(rule_set, text))
+    if rule_set.scanner is not None:
+        got = _spans(rules._scan_combined(rule_set, rule_set.scanner, text))
+        assert got == expected, (pattern_lists, text)
+    return expected
+
+
+def test_overlapping_chain_tie_goes_to_per_pattern_winner():
+    # '(?:ab)+' consumes 2..6, so its finditer never reports (4, 6)
+    assert _assert_same([["(?:ab)+"], ["ab"], ["a+", "ab"]], "baabab   ") == [(1, 3, "r2"), (4, 6, "r1")]
+
+
+def test_match_inside_a_pattern_previous_match_is_not_reported():
+    # 'a+' matches 2..5 once; (3, 5) is not one of its finditer matches
+    assert _assert_same([["aab\\b", "b\\b\\ba"], ["a+"], ["\\ba", "ba"]], " baaa ab") == [(1, 3, "r2"), (6, 7, "r1")]
+
+
+def test_patterns_matching_empty_fall_back_to_per_pattern():
+    assert _rule_set([["a*"], ["b"]]).scanner is None
+    assert _rule_set([["\\b"]]).scanner is None
+    assert _rule_set([["a+"], ["b"]]).scanner is not None
+
+
+ATOMS = ["a", "b", "ab", "ba", "aa", "[ab]", "\\s", "\\w", "\\ba", "b\\b", "x"]
+QUANT = ["", "", "", "+", "*", "?", "{1,2}"]
+
+
+def _random_pattern(rng):
+    parts = [f"(?:{rng.choice(ATOMS)}){rng.choice(QUANT)}" for _ in range(rng.randint(1, 3))]
+    if rng.random() < 0.2:
+        return "|".join(parts)
+    return "".join(parts)
+
+
+def test_combined_scan_matches_per_pattern_scan_fuzzed():
+    rng = random.Random(8)
+    combined_runs = 0
+    for _ in range(5000):
+        pattern_lists = [[_random_pattern(rng) for _ in range(rng.randint(1, 3))] for _ in range(rng.randint(1, 4))]
+        text = "".join(rng.choice("ab  x") for _ in range(rng.randint(0, 14)))
+        _assert_same(pattern_lists, text)
+        combined_runs += _rule_set(pattern_lists).scanner is not None
+    assert combined_runs > 1000
+
+
+def test_real_rule_files_agree():
+    text = "That plan is insane and crazy. You should man up now, don't act like a man. " * 3
+    for lang in ("en", "de", "lv"):
+        rule_set = rules.get_rule_set(lang)
+        assert rule_set is not None
+        if rule_set.scanner is not None:
+            combined = _spans(rules._scan_combined(rule_set, rule_set.scanner, text))
+            assert combined == _spans(rules._scan_per_pattern(rule_set, text))
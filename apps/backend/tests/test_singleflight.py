@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app.core import singleflight
+from app.core.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    async def run():
+        sf = SingleFlight()
+        runs = 0
+
+        async def fn():
+            nonlocal runs
+            runs += 1
+            await asyncio.sleep(0.02)
+            return {"runs": runs}
+
+        results = await asyncio.gather(*(sf.do("k", fn) for _ in range(10)))
+        other = await sf.do("other", fn)
+        return sf, runs, results, other
+
+    sf, runs, results, other = asyncio.run(run())
+    assert runs == 2  # one for "k", one for "other"
+    assert all(r is results[0] for r in results)
+    assert other == {"runs": 2}
+    assert sf.stats() == {"calls": 11, "coalesced": 9, "in_flight": 0}
+
+
+def test_sequential_calls_run_again():
+    async def run():
+        sf = SingleFlight()
+        runs = []
+
+        async def fn():
+            runs.append(1)
+            return len(runs)
+
+        return [await sf.do("k", fn) for _ in range(3)]
+
+    assert asyncio.run(run()) == [1, 2, 3]
+
+
+def test_exception_reaches_every_waiter_and_clears_the_key():
+    async def run():
+        sf = SingleFlight()
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(sf.do("k", boom) for _ in range(3)), return_exceptions=True)
+        in_flight = sf.stats()["in_flight"]
+
+        async def ok():
+            return "ok"
+
+        return results, in_flight, await sf.do("k", ok)
+
+    results, in_flight, retry = asyncio.run(run())
+    assert all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+    assert in_flight == 0
+    assert retry == "ok"
+
+
+def test_cancelled_follower_does_not_cancel_the_shared_task():
+    async def run():
+        sf = SingleFlight()
+        finished = []
+
+        async def fn():
+            await asyncio.sleep(0.05)
+            finished.append(True)
+            return "result"
+
+        leader = asyncio.ensure_future(sf.do("k", fn))
+        follower = asyncio.ensure_future(sf.do("k", fn))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader, finished
+
+    result, finished = asyncio.run(run())
+    assert result == "result"
+    assert finished == [True]
+
+
+def test_cancelled_leader_does_not_cancel_the_followers():
+    async def run():
+        sf = SingleFlight()
+
+        async def fn():
+            await asyncio.sleep(0.05)
+            return "result"
+
+        leader = asyncio.ensure_future(sf.do("k", fn))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(sf.do("k", fn))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(run()) == "result"
+
+
+def test_group_is_shared_by_name():
+    assert singleflight.group("test-group") is singleflight.group("test-group")
+    assert "test-group" in singleflight.stats()
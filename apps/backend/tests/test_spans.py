@@ -0,0 +1,108 @@
+import pytest
+
+from app.services.postprocess import build_safe_text
+from app.services.spans import apply_edits, as_span, find_all_occurrences, locate, nearest, resolve_overlaps
+
+
+@pytest.mark.parametrize(
+    "start, end, expected",
+    [
+        (0, 5, (0, 5)),
+        ("1", "3", (1, 3)),  # numeric strings from model JSON
+        (2, 2, None),  # empty
+        (3, 1, None),
+        (-1, 2, None),
+        (0, 6, None),  # past the end
+        (None, 2, None),
+        ("a", 2, None),
+    ],
+)
+def test_as_span(start, end, expected):
+    assert as_span("hello", start, end) == expected
+
+
+def test_find_all_occurrences_is_non_overlapping():
+    assert find_all_occurrences("aaaa", "aa") == [(0, 2), (2, 4)]
+    assert find_all_occurrences("abc", "") == []
+
+
+def test_locate_prefers_occurrence_nearest_to_hint():
+    text = "ab ab ab"
+    assert locate(text, "ab") == (0, 2)
+    assert locate(text, "ab", hint=5) == (6, 8)
+    assert locate(text, "ab", hint=4) == (3, 5)
+    assert locate(text, "ab", hint=-1) == (0, 2)
+    assert locate(text, "zz", hint=3) is None
+    assert locate(text, "", hint=3) is None
+
+
+def test_locate_hint_tie_keeps_first_occurrence():
+    # occurrences at 0 and 4, hint 2 is equally far from both
+    assert locate("ab__ab", "ab", hint=2) == (0, 2)
+    assert nearest([(4, 6), (0, 2)], 2) == (4, 6)  # first as given
+    assert nearest([], 2) is None
+
+
+def test_resolve_overlaps_is_leftmost_longest():
+    edits = [(4, 6, "b"), (0, 3, "a"), (2, 5, "x"), (0, 5, "long")]
+    assert resolve_overlaps(edits) == [(0, 5, "long")]
+    assert resolve_overlaps([(0, 2, "a"), (2, 4, "b")]) == [(0, 2, "a"), (2, 4, "b")]  # touching is fine
+
+
+def test_resolve_overlaps_equal_spans_keep_first_given():
+    assert resolve_overlaps([(1, 3, "first"), (1, 3, "second")]) == [(1, 3, "first")]
+
+
+def test_resolve_overlaps_zero_length_inserts():
+    # an insert at the start of a kept edit loses to it; one at its end is kept
+    assert resolve_overlaps([(2, 2, "^"), (2, 4, "x")]) == [(2, 4, "x")]
+    assert resolve_overlaps([(4, 4, "$"), (2, 4, "x")]) == [(2, 4, "x"), (4, 4, "$")]
+    assert resolve_overlaps([(1, 1, "a"), (1, 1, "b")]) == [(1, 1, "a"), (1, 1, "b")]
+
+
+def test_apply_edits():
+    text = "the quick brown fox"
+    assert apply_edits(text, []) == text
+    assert apply_edits(text, [(16, 19, "cat"), (4, 9, "slow")]) == "the slow brown cat"
+    # overlapping: the leftmost-longest edit wins, the others are dropped
+    assert apply_edits(text, [(4, 9, "slow"), (4, 15, "lazy"), (10, 15, "red")]) == "the lazy fox"
+    # zero-length insert
+    assert apply_edits(text, [(0, 0, ">> "), (19, 19, "!")]) == ">> the quick brown fox!"
+    # edits outside the text are ignored
+    assert apply_edits(text, [(15, 25, "x"), (-1, 2, "y"), (5, 3, "z")]) == text
+
+
+def _item(text, word, replacement, severity="warn"):
+    start = text.index(word)
+    return {"start": start, "end": start + len(word), "replacement_text": replacement, "severity": severity}
+
+
+def test_build_safe_text():
+    text = "he is crazy and lame"
+    items = [_item(text, "crazy", "wild"), _item(text, "lame", "weak")]
+    assert build_safe_text(text, items) == "he is wild and weak"
+    assert build_safe_text(text, []) == text
+
+    # overlapping items: the longer one starting first wins
+    phrase = _item(text, "is crazy", "seems off")
+    assert build_safe_text(text, [items[0], phrase]) == "he seems off and lame"
+
+    # a block item without a replacement means there is no safe text
+    assert build_safe_text(text, [_item(text, "lame", None, severity="block")]) is None
+
+
+def test_llm_repair_indices_uses_first_occurrence():
+    from app.services.llm import _repair_indices
+
+    text = "lame idea, lame plan"
+    item = {"original": "lame", "start": 11, "end": 15}
+    _repair_indices(text, item)
+    assert (item["start"], item["end"]) == (11, 15)  # already valid
+
+    item = {"original": "lame", "start": "x", "end": 99}
+    _repair_indices(text, item)
+    assert (item["start"], item["end"]) == (0, 4)
+
+    item = {"original": "missing", "start": 1, "end": 2}
+    _repair_indices(text, item)
+    assert (item["start"], item["end"]) == (1, 2)
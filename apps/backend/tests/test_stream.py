@@ -0,0 +1,138 @@
+import asyncio
+import json
+import types
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes
+from app.core import budget
+from app.core import openai_client as oc
+from app.core.cache import cache_clear
+from app.core.config import settings
+
+TEXT = "You are crazy. That is lame. He is insane."
+WORDS = ["crazy", "lame", "insane"]
+
+
+class FakeCompletions:
+    def __init__(self, delay=0.01, fail_detect=False):
+        self.delay = delay
+        self.fail_detect = fail_detect
+        self.started = 0
+        self.finished = 0
+        self.cancelled = 0
+
+    async def create(self, model, messages, temperature, **kw):
+        if "Detect discriminatory" in messages[0]["content"]:
+            if self.fail_detect:
+                raise RuntimeError("upstream down")
+            findings = [
+                {"id": f"f{i}", "type": "replace", "subtype": "simple", "start": TEXT.index(w), "end": TEXT.index(w) + len(w)}
+                for i, w in enumerate(WORDS)
+            ]
+            content = json.dumps({"language": "en", "findings": findings})
+        else:
+            self.started += 1
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            self.finished += 1
+            sentence = messages[1]["content"]
+            word = next(w for w in WORDS if w in sentence)
+            content = json.dumps({"suggestions": [{"replacement": f"not-{word}", "message": "m"}]})
+        usage = types.SimpleNamespace(prompt_tokens=10, completion_tokens=5)
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    monkeypatch.setattr(settings, "llm_suggest_mode", "concurrent")
+    monkeypatch.setattr(settings, "llm_suggest_concurrency", 4)
+    monkeypatch.setattr(settings, "llm_request_token_budget", 0)
+    monkeypatch.setattr(settings, "prefilter_mode", "off")
+    monkeypatch.setattr(settings, "analyze_cache_ttl", 0)
+    monkeypatch.setattr(budget.minute_budget, "limit", 0)
+    completions = FakeCompletions()
+    monkeypatch.setattr(oc, "_client", types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions)))
+    cache_clear()
+    yield completions
+    cache_clear()
+
+
+def _events(body):
+    out = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        out.append((lines["event"], json.loads(lines["data"])))
+    return out
+
+
+def _stream(text=TEXT):
+    app = FastAPI()
+    app.include_router(routes.router, prefix="/api")
+    r = TestClient(app).post("/api/analyze/stream", json={"text": text})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    return _events(r.text)
+
+
+def test_event_sequence(fake):
+    events = _stream()
+    names = [name for name, _ in events]
+    assert names == ["findings", "suggestions", "suggestions", "suggestions", "summary"]
+
+    findings = events[0][1]["findings"]
+    assert [f["original"] for f in findings] == WORDS
+    assert "suggestions" not in findings[0]  # step-1 view only
+    assert events[0][1]["actions"]["copy_enabled"] is False
+
+    suggested = {data["id"]: data["suggestions"][0]["replacement"] for _, data in events[1:4]}
+    assert suggested == {f["id"]: f"not-{f['original']}" for f in findings}
+
+    summary = events[-1][1]
+    assert summary["overall"] == "replace"
+    assert [f["suggestions"][0]["replacement"] for f in summary["findings"]] == [f"not-{w}" for w in WORDS]
+
+
+def test_failure_yields_an_error_event(fake):
+    fake.fail_detect = True
+    assert _stream() == [("error", {"detail": "upstream down"})]
+
+
+def test_exhausted_minute_budget_yields_a_429_error_event(fake, monkeypatch):
+    monkeypatch.setattr(budget, "minute_budget", budget.MinuteBudget(10))
+    budget.minute_budget.add(50)
+
+    [(name, data)] = _stream()
+    assert name == "error"
+    assert data["status"] == 429
+    assert data["retry_after"] >= 1
+
+
+def test_consumer_going_away_cancels_pending_suggestion_calls(fake, monkeypatch):
+    monkeypatch.setattr(settings, "llm_suggest_concurrency", 1)
+    fake.delay = 0.05
+
+    async def run():
+        budget.begin_request()
+        findings = [
+            {"id": w, "type": "replace", "subtype": "simple", "start": TEXT.index(w), "end": TEXT.index(w) + len(w)}
+            for w in WORDS
+        ]
+        gen = oc._iter_suggestions(TEXT, findings, "en")
+        first = await gen.__anext__()
+        await asyncio.sleep(0.01)  # second call in flight
+        await gen.aclose()
+        await asyncio.sleep(0.1)  # time for the rest, had they not been cancelled
+        return first
+
+    first = asyncio.run(run())
+    assert first["suggestions"][0]["replacement"].startswith("not-")
+    assert fake.finished == 1
+    assert fake.cancelled == 1
+    assert fake.started == 2  # the third never started
@@ -0,0 +1,49 @@
+import random
+import re
+
+from app.core.patterns import TARGET_TERMS_EN, TARGET_TERMS_TR, TermMatcher, detect_targets
+
+TERMS = sorted(TARGET_TERMS_EN | TARGET_TERMS_TR)
+NOISE = ["ve", "çok", "iyi", "the", "are", "ılık", "şey", "ok", "x1", "_", "İ", "I", "ı"]
+SEPARATORS = [" ", " ", ", ", ". ", "-", "'", "\n", ""]
+
+
+def _variant(rng, word):
+    case = rng.randrange(3)
+    if case == 1:
+        return word.upper()
+    if case == 2:
+        return word[:1].upper() + word[1:]
+    return word
+
+
+def _corpus(seed, n):
+    rng = random.Random(seed)
+    for _ in range(n):
+        words = [_variant(rng, rng.choice(TERMS if rng.random() < 0.5 else NOISE)) for _ in range(rng.randint(1, 12))]
+        yield "".join(w + rng.choice(SEPARATORS) for w in words)
+
+
+def _regex_hits(terms, text):
+    hits = set()
+    for term in terms:
+        for m in re.finditer(rf"\b{re.escape(term)}\b", text, re.I):
+            hits.add((m.start(), m.end()))
+    return hits
+
+
+def test_matches_regex_on_turkish_and_ascii_corpus():
+    matcher = TermMatcher(TERMS)
+    for text in _corpus(seed=6, n=3000):
+        assert set(matcher.find(text)) == _regex_hits(TERMS, text), text
+
+
+def test_dotted_capital_i_matches_like_regex():
+    text = "İnsanlar çok iyi"
+    assert _regex_hits(["insanlar"], text) == {(0, 8)}
+    assert TermMatcher(["insanlar"]).find(text) == [(0, 8)]
+    assert [(m.start, m.end) for m in detect_targets(text)] == [(0, 8)]
+
+
+def test_without_word_boundary_reports_overlapping_hits():
+    assert sorted(TermMatcher(["aa"], word_boundary=False).find("aaa")) == [(0, 2), (1, 3)]